@@ -2,7 +2,13 @@ import streamlit as st
 
 from aws.dynamodb_connector import DynamoDBConnector
 
-DynamoDBConnector().initiate_connection()
+
+@st.cache_resource
+def init_storage() -> DynamoDBConnector:
+    return DynamoDBConnector().initiate_connection()
+
+
+init_storage()
 
 pg = st.navigation(pages=[
     st.Page("views/dashboard.py", title="Главная"),
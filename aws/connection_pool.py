@@ -0,0 +1,130 @@
+import threading
+import weakref
+
+import boto3
+from botocore.config import Config
+
+from aws.throttling import THROTTLING_ERROR_CODES
+from configs.config import settings
+
+
+class ConnectionPool:
+    def __init__(self):
+        self.config = Config(
+            max_pool_connections=settings.get('DYNAMO.MAX_POOL_CONNECTIONS', 50),
+            retries={
+                'mode': settings.get('DYNAMO.RETRY_MODE', 'adaptive'),
+                'max_attempts': settings.get('DYNAMO.MAX_ATTEMPTS', 10)
+            },
+            tcp_keepalive=settings.get('DYNAMO.TCP_KEEPALIVE', True),
+            connect_timeout=settings.get('DYNAMO.CONNECT_TIMEOUT', 5),
+            read_timeout=settings.get('DYNAMO.READ_TIMEOUT', 30)
+        )
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # Weak references, so a thread's client is released with the thread.
+        self._clients = weakref.WeakSet()
+        self._requests_sent = 0
+
+        # Low-level clients are thread-safe and shared by every thread.
+        self.client = self._new_session().client('dynamodb', **self._client_kwargs())
+        self._track(self.client)
+
+    def resource(self):
+        # boto3 resources are not thread-safe, so each thread gets its own,
+        # built from its own session and reused for the life of the thread.
+        resource = getattr(self._local, 'resource', None)
+        if resource is None:
+            resource = self._new_session().resource('dynamodb', **self._client_kwargs())
+            self._local.resource = resource
+            self._local.tables = {}
+            self._track(resource.meta.client)
+        return resource
+
+    def table(self, table_name: str):
+        resource = self.resource()
+        table = self._local.tables.get(table_name)
+        if table is None:
+            table = resource.Table(table_name)
+            self._local.tables[table_name] = table
+        return table
+
+    def stats(self) -> dict:
+        opened = 0
+        served = 0
+        with self._lock:
+            clients = list(self._clients)
+            requests_sent = self._requests_sent
+
+        for client in clients:
+            for pool in self._connection_pools(client):
+                opened += getattr(pool, 'num_connections', 0)
+                served += getattr(pool, 'num_requests', 0)
+
+        return {
+            'clients': len(clients),
+            'requests': requests_sent,
+            'connections_opened': opened,
+            'connection_reuse_ratio': round(1 - opened / served, 4) if served else 0.0,
+        }
+
+    def _new_session(self) -> boto3.session.Session:
+        return boto3.session.Session(
+            aws_access_key_id=settings.AWS.DYNAMO_ACCESS_KEY,
+            aws_secret_access_key=settings.AWS.DYNAMO_SECRET_ACCESS_KEY,
+            region_name=settings.AWS.DYNAMO_REGION_NAME
+        )
+
+    def _client_kwargs(self) -> dict:
+        return {'config': self.config, 'endpoint_url': settings.get('STORAGE.ENDPOINT_URL')}
+
+    def take_throttles(self) -> int:
+        # Throttled responses botocore saw on this thread since the last
+        # call, including the ones its own retries absorbed.
+        throttles = getattr(self._local, 'throttles', 0)
+        self._local.throttles = 0
+        return throttles
+
+    def _track(self, client):
+        client.meta.events.register('request-created.dynamodb', self._count_request)
+        client.meta.events.register('needs-retry.dynamodb', self._count_throttle)
+        with self._lock:
+            self._clients.add(client)
+
+    def _count_request(self, **kwargs):
+        with self._lock:
+            self._requests_sent += 1
+
+    def _count_throttle(self, response=None, **kwargs):
+        if response is None:
+            return
+        code = response[1].get('Error', {}).get('Code')
+        if code in THROTTLING_ERROR_CODES:
+            self._local.throttles = getattr(self._local, 'throttles', 0) + 1
+
+    def _connection_pools(self, client) -> list:
+        # urllib3 keeps per-host pools that count opened connections and
+        # served requests; botocore does not expose them publicly.
+        try:
+            pools = client._endpoint.http_session._manager.pools
+            return [pools.get(key) for key in pools.keys()]
+        except Exception:
+            return []
+
+
+class StaticPool:
+    def __init__(self, resource):
+        self._resource = resource
+        self.client = resource.meta.client
+
+    def resource(self):
+        return self._resource
+
+    def table(self, table_name: str):
+        return self._resource.Table(table_name)
+
+    def take_throttles(self) -> int:
+        return 0
+
+    def stats(self) -> dict:
+        return {}
\ No newline at end of file
@@ -1,20 +1,26 @@
-import boto3
+import hashlib
+import json
+import os
+import threading
 from botocore.exceptions import ClientError
+from concurrent.futures import ThreadPoolExecutor
 from typing import Self
 
 from configs.config import settings
-from aws.tables_schemas import TABLE_SCHEMAS
+from aws.connection_pool import ConnectionPool, StaticPool
+from aws.tables_schemas import PAY_PER_REQUEST, PROVISIONED, TABLE_SCHEMAS
 
 
 class DynamoDBConnector:
     _instance = None
     _initialized = False
-    
+    _bootstrap_lock = threading.Lock()
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
-    
+
     def __init__(self):
         if not self._initialized:
             self._init_connection()
@@ -22,35 +28,194 @@ class DynamoDBConnector:
             DynamoDBConnector._initialized = True
 
     def _init_connection(self):
-        self.resource = boto3.resource(
-            'dynamodb',
-            aws_access_key_id=settings.AWS.DYNAMO_ACCESS_KEY,
-            aws_secret_access_key=settings.AWS.DYNAMO_SECRET_ACCESS_KEY,
-            region_name=settings.AWS.DYNAMO_REGION_NAME
-        )
-        self.client = self.resource.meta.client
+        self.backend = settings.get('STORAGE.BACKEND', 'dynamodb')
+        self.pool = self._create_pool(self.backend)
+        self.client = self.pool.client
+        self.write_capacities: dict[str, float] = {}
+
+    def _create_pool(self, backend: str):
+        if backend == 'memory':
+            from aws.memory_backend import MemoryBackend
+            return StaticPool(MemoryBackend())
+
+        if backend == 'dynamodb':
+            return ConnectionPool()
+
+        raise ValueError(f"Unknown storage backend: {backend}")
+
+    @property
+    def resource(self):
+        return self.pool.resource()
+
+    def table(self, table_name: str):
+        return self.pool.table(table_name)
+
+    def take_throttles(self) -> int:
+        return self.pool.take_throttles()
+
+    def stats(self) -> dict:
+        return self.pool.stats()
 
     def initiate_connection(self) -> Self:
         if not self._table_check_done:
-            self._ensure_tables_exist()
-            self._table_check_done = True
+            with DynamoDBConnector._bootstrap_lock:
+                if not self._table_check_done:
+                    self._ensure_tables_exist()
+                    self._table_check_done = True
         return self
 
     def _ensure_tables_exist(self):
-        for table_schema in TABLE_SCHEMAS:
-            self._create_table_if_not_exists(table_schema)
+        schema_version = self._schema_version()
+        if self._load_schema_stamp(schema_version):
+            return
+
+        with ThreadPoolExecutor(max_workers=len(TABLE_SCHEMAS)) as executor:
+            ready = list(executor.map(self._create_table_if_not_exists, TABLE_SCHEMAS))
+
+        if all(ready):
+            self._save_schema_stamp(schema_version)
+
+    def _schema_version(self) -> str:
+        schemas = [
+            {
+                'table_name': table_schema.table_name,
+                'key_schema': table_schema.key_schema,
+                'attribute_definitions': table_schema.get_attribute_definitions(),
+                'indexes': table_schema.get_global_secondary_indexes(),
+                'ttl_attribute': table_schema.ttl_attribute,
+                'billing_mode': table_schema.billing_mode,
+            }
+            for table_schema in TABLE_SCHEMAS
+        ]
+        target = [self.backend, settings.get('AWS.DYNAMO_REGION_NAME'), settings.get('STORAGE.ENDPOINT_URL')]
+        payload = json.dumps([target, schemas], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
 
-    def _create_table_if_not_exists(self, table_schema):
+    def _schema_stamp_path(self) -> str | None:
+        # Nothing persists between runs of the memory backend.
+        if self.backend == 'memory':
+            return None
+        return settings.get('STORAGE.SCHEMA_STAMP_PATH', '.dynamodb_schema_stamp.json')
+
+    def _load_schema_stamp(self, schema_version: str) -> bool:
+        path = self._schema_stamp_path()
+        if not path or not os.path.exists(path):
+            return False
+        try:
+            with open(path) as f:
+                stamp = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if stamp.get('schema_version') != schema_version:
+            return False
+        self.write_capacities.update(stamp.get('write_capacities', {}))
+        return True
+
+    def _save_schema_stamp(self, schema_version: str):
+        path = self._schema_stamp_path()
+        if not path:
+            return
         try:
-            self.client.describe_table(TableName=table_schema.table_name)
+            with open(path, 'w') as f:
+                json.dump({'schema_version': schema_version, 'write_capacities': self.write_capacities}, f)
+        except OSError as e:
+            print(f"Unable to save DynamoDB schema stamp: {e}")
+
+    def _create_table_if_not_exists(self, table_schema) -> bool:
+        try:
+            response = self.client.describe_table(TableName=table_schema.table_name)
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ResourceNotFoundException':
+                raise
+            self._create_table(table_schema)
+            self._record_write_capacity(table_schema, table_schema.get_billing_params())
+            return True
+
+        table_description = response['Table']
+        if table_description.get('TableStatus') != 'ACTIVE':
+            self.client.get_waiter('table_exists').wait(TableName=table_schema.table_name)
+
+        billing_ready = self._ensure_billing_mode(table_schema, table_description)
+        self._record_write_capacity(table_schema, table_description)
+        indexes_ready = billing_ready and self._ensure_indexes_exist(table_schema, table_description)
+        self._ensure_ttl_enabled(table_schema)
+        return indexes_ready
+
+    def _record_write_capacity(self, table_schema, table_description: dict):
+        if self.backend == 'memory' or table_schema.billing_mode == PAY_PER_REQUEST:
+            self.write_capacities[table_schema.table_name] = 0
+            return
+        throughput = table_description.get('ProvisionedThroughput', {})
+        self.write_capacities[table_schema.table_name] = float(throughput.get('WriteCapacityUnits') or 0)
+
+    def _ensure_billing_mode(self, table_schema, table_description: dict) -> bool:
+        current = table_description.get('BillingModeSummary', {}).get('BillingMode', PROVISIONED)
+        if current == table_schema.billing_mode or table_schema.billing_mode != PAY_PER_REQUEST:
+            return True
+
+        # Tables created before they were switched to on-demand are converted
+        # in place; the table is busy until the update finishes.
+        try:
+            self.client.update_table(TableName=table_schema.table_name, BillingMode=PAY_PER_REQUEST)
+            print(f"Switching {table_schema.table_name} to on-demand capacity")
         except ClientError as e:
-            if e.response['Error']['Code'] == 'ResourceNotFoundException':
-                self._create_table(table_schema)
+            print(f"Unable to switch {table_schema.table_name} to on-demand capacity: {e}")
+        return False
 
     def _create_table(self, table_schema):
-        self.client.create_table(
+        params = {
+            'TableName': table_schema.table_name,
+            'KeySchema': table_schema.key_schema,
+            'AttributeDefinitions': table_schema.get_attribute_definitions(),
+            **table_schema.get_billing_params()
+        }
+        indexes = table_schema.get_global_secondary_indexes()
+        if indexes:
+            params['GlobalSecondaryIndexes'] = indexes
+        self.client.create_table(**params)
+        self.client.get_waiter('table_exists').wait(TableName=table_schema.table_name)
+        self._ensure_ttl_enabled(table_schema)
+
+    def _ensure_ttl_enabled(self, table_schema):
+        if not table_schema.ttl_attribute:
+            return
+
+        response = self.client.describe_time_to_live(TableName=table_schema.table_name)
+        status = response.get('TimeToLiveDescription', {}).get('TimeToLiveStatus')
+        if status in ('ENABLED', 'ENABLING'):
+            return
+
+        self.client.update_time_to_live(
             TableName=table_schema.table_name,
-            KeySchema=table_schema.key_schema,
-            AttributeDefinitions=table_schema.attribute_definitions,
-            ProvisionedThroughput=table_schema.provisioned_throughput
-        )
\ No newline at end of file
+            TimeToLiveSpecification={
+                'Enabled': True,
+                'AttributeName': table_schema.ttl_attribute
+            }
+        )
+
+    def _ensure_indexes_exist(self, table_schema, table_description: dict) -> bool:
+        existing = {
+            index['IndexName']: index.get('IndexStatus')
+            for index in table_description.get('GlobalSecondaryIndexes', [])
+        }
+        missing = [
+            index for index in table_schema.get_global_secondary_indexes()
+            if index['IndexName'] not in existing
+        ]
+        if not missing:
+            return all(status == 'ACTIVE' for status in existing.values())
+
+        # DynamoDB accepts a single index creation per update_table call and
+        # backfills it from the existing items on its own. The remaining
+        # indexes are picked up on the next start, once this one is ACTIVE.
+        index = missing[0]
+        try:
+            self.client.update_table(
+                TableName=table_schema.table_name,
+                AttributeDefinitions=table_schema.get_attribute_definitions(),
+                GlobalSecondaryIndexUpdates=[{'Create': index}]
+            )
+            print(f"Creating index {index['IndexName']} on {table_schema.table_name}")
+        except ClientError as e:
+            print(f"Unable to create index {index['IndexName']} on {table_schema.table_name}: {e}")
+        return False
\ No newline at end of file
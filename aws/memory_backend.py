@@ -0,0 +1,351 @@
+import copy
+import re
+import threading
+import zlib
+from types import SimpleNamespace
+from typing import Any, Optional
+
+from boto3.dynamodb.types import TypeDeserializer, TypeSerializer
+from botocore.exceptions import ClientError
+
+
+_serializer = TypeSerializer()
+_deserializer = TypeDeserializer()
+
+SET_CLAUSE = re.compile(r'^\s*SET\s+(.*)$', re.IGNORECASE | re.DOTALL)
+
+
+def _client_error(code: str, message: str, operation: str) -> ClientError:
+    return ClientError({'Error': {'Code': code, 'Message': message}}, operation)
+
+
+def _normalize(item: dict) -> dict:
+    # Round-trip through the boto3 serializer so stored values get the same
+    # types (Decimal numbers, rejected floats) a real table would give back.
+    return {k: _deserializer.deserialize(_serializer.serialize(v)) for k, v in item.items()}
+
+
+def _attr_name(operand) -> str:
+    return operand.name
+
+
+def evaluate_condition(condition, item: dict) -> bool:
+    expression = condition.get_expression()
+    operator = expression['operator']
+    values = expression['values']
+
+    if operator == 'AND':
+        return evaluate_condition(values[0], item) and evaluate_condition(values[1], item)
+    if operator == 'OR':
+        return evaluate_condition(values[0], item) or evaluate_condition(values[1], item)
+    if operator == 'NOT':
+        return not evaluate_condition(values[0], item)
+
+    name = _attr_name(values[0])
+    if operator == 'attribute_exists':
+        return name in item
+    if operator == 'attribute_not_exists':
+        return name not in item
+    if name not in item:
+        return False
+
+    value = item[name]
+    operands = values[1:]
+    try:
+        if operator == '=':
+            return value == operands[0]
+        if operator == '<>':
+            return value != operands[0]
+        if operator == '<':
+            return value < operands[0]
+        if operator == '<=':
+            return value <= operands[0]
+        if operator == '>':
+            return value > operands[0]
+        if operator == '>=':
+            return value >= operands[0]
+        if operator == 'BETWEEN':
+            return operands[0] <= value <= operands[1]
+        if operator == 'IN':
+            return value in operands[0]
+        if operator == 'begins_with':
+            return isinstance(value, str) and value.startswith(operands[0])
+        if operator == 'contains':
+            return operands[0] in value
+    except TypeError:
+        return False
+
+    raise NotImplementedError(f"Operator {operator} is not supported by the memory backend")
+
+
+class MemoryTable:
+    def __init__(self, backend: 'MemoryBackend', name: str):
+        self._backend = backend
+        self.name = name
+
+    @property
+    def _state(self) -> 'TableState':
+        return self._backend.get_table_state(self.name, 'Table')
+
+    def put_item(self, Item: dict, ConditionExpression=None, **kwargs) -> dict:
+        with self._backend.lock:
+            state = self._state
+            key = state.key_of(Item)
+            if ConditionExpression is not None:
+                existing = state.items.get(key, {})
+                if not evaluate_condition(ConditionExpression, existing):
+                    raise _client_error('ConditionalCheckFailedException',
+                                        'The conditional request failed', 'PutItem')
+            state.check_index_keys(Item, 'PutItem')
+            state.items[key] = _normalize(Item)
+        return {}
+
+    def get_item(self, Key: dict, **kwargs) -> dict:
+        with self._backend.lock:
+            state = self._state
+            item = state.items.get(state.key_of(Key))
+            return {'Item': copy.deepcopy(item)} if item is not None else {}
+
+    def delete_item(self, Key: dict, **kwargs) -> dict:
+        with self._backend.lock:
+            state = self._state
+            state.items.pop(state.key_of(Key), None)
+        return {}
+
+    def update_item(self, Key: dict, UpdateExpression: str,
+                    ExpressionAttributeNames: Optional[dict] = None,
+                    ExpressionAttributeValues: Optional[dict] = None,
+                    ConditionExpression=None, ReturnValues: str = 'NONE', **kwargs) -> dict:
+        names = ExpressionAttributeNames or {}
+        values = ExpressionAttributeValues or {}
+
+        match = SET_CLAUSE.match(UpdateExpression)
+        if not match:
+            raise NotImplementedError("Only SET update expressions are supported by the memory backend")
+
+        assignments = {}
+        for clause in match.group(1).split(','):
+            target, placeholder = (part.strip() for part in clause.split('='))
+            assignments[names.get(target, target)] = values[placeholder]
+
+        with self._backend.lock:
+            state = self._state
+            key = state.key_of(Key)
+            existing = state.items.get(key)
+            if ConditionExpression is not None and not evaluate_condition(ConditionExpression, existing or {}):
+                raise _client_error('ConditionalCheckFailedException',
+                                    'The conditional request failed', 'UpdateItem')
+
+            updated = dict(existing or Key)
+            updated.update(_normalize(assignments))
+            state.check_index_keys(updated, 'UpdateItem')
+            state.items[key] = updated
+
+            if ReturnValues == 'ALL_NEW':
+                return {'Attributes': copy.deepcopy(updated)}
+            if ReturnValues == 'ALL_OLD' and existing is not None:
+                return {'Attributes': copy.deepcopy(existing)}
+            return {}
+
+    def scan(self, FilterExpression=None, Segment: Optional[int] = None,
+             TotalSegments: Optional[int] = None, **kwargs) -> dict:
+        with self._backend.lock:
+            state = self._state
+            items = list(state.items.values())
+
+        if TotalSegments:
+            items = [
+                item for item in items
+                if zlib.crc32(repr(state.key_of(item)).encode()) % TotalSegments == Segment
+            ]
+        return state.page(items, FilterExpression, **kwargs)
+
+    def query(self, KeyConditionExpression, IndexName: Optional[str] = None,
+              FilterExpression=None, ScanIndexForward: bool = True, **kwargs) -> dict:
+        with self._backend.lock:
+            state = self._state
+            items = [
+                item for item in state.items.values()
+                if evaluate_condition(KeyConditionExpression, item)
+            ]
+
+        range_key = state.range_key(IndexName, 'Query')
+        if range_key:
+            items.sort(key=lambda item: item.get(range_key), reverse=not ScanIndexForward)
+        return state.page(items, FilterExpression, **kwargs)
+
+
+class TableState:
+    def __init__(self, description: dict):
+        self.description = description
+        self.items: dict[tuple, dict] = {}
+        self.key_names = [k['AttributeName'] for k in description['KeySchema']]
+
+    def key_of(self, item: dict) -> tuple:
+        try:
+            return tuple(item[name] for name in self.key_names)
+        except KeyError as e:
+            raise _client_error('ValidationException',
+                                f'Missing the key {e.args[0]} in the item', 'PutItem')
+
+    def check_index_keys(self, item: dict, operation: str) -> None:
+        # Like DynamoDB: an index key may be missing, but not null or empty.
+        for index in self.description.get('GlobalSecondaryIndexes', []):
+            for key in index['KeySchema']:
+                if key['AttributeName'] in item and item[key['AttributeName']] in (None, ''):
+                    raise _client_error('ValidationException',
+                                        'One or more parameter values are not valid. A value specified '
+                                        'for a secondary index key is not supported', operation)
+
+    def range_key(self, index_name: Optional[str], operation: str) -> Optional[str]:
+        key_schema = self.description['KeySchema']
+        if index_name:
+            key_schema = next(
+                (index['KeySchema'] for index in self.description.get('GlobalSecondaryIndexes', [])
+                 if index['IndexName'] == index_name),
+                None
+            )
+            if key_schema is None:
+                raise _client_error('ValidationException',
+                                    f'The table does not have the specified index: {index_name}', operation)
+        return next((k['AttributeName'] for k in key_schema if k['KeyType'] == 'RANGE'), None)
+
+    def page(self, items: list[dict], filter_expression=None, Limit: Optional[int] = None,
+             ExclusiveStartKey: Optional[dict] = None, ProjectionExpression: Optional[str] = None,
+             ExpressionAttributeNames: Optional[dict] = None, **kwargs) -> dict:
+        if ExclusiveStartKey:
+            start_key = self.key_of(ExclusiveStartKey)
+            keys = [self.key_of(item) for item in items]
+            items = items[keys.index(start_key) + 1:] if start_key in keys else []
+
+        response = {}
+        if Limit and len(items) > Limit:
+            items = items[:Limit]
+            response['LastEvaluatedKey'] = {name: items[-1][name] for name in self.key_names}
+
+        if filter_expression is not None:
+            items = [item for item in items if evaluate_condition(filter_expression, item)]
+
+        if ProjectionExpression:
+            names = ExpressionAttributeNames or {}
+            attributes = [names.get(p.strip(), p.strip()) for p in ProjectionExpression.split(',')]
+            items = [{a: item[a] for a in attributes if a in item} for item in items]
+
+        response['Items'] = copy.deepcopy(items)
+        response['Count'] = len(items)
+        return response
+
+
+class MemoryClient:
+    def __init__(self, backend: 'MemoryBackend'):
+        self._backend = backend
+
+    def describe_table(self, TableName: str) -> dict:
+        return {'Table': copy.deepcopy(self._backend.get_table_state(TableName, 'DescribeTable').description)}
+
+    def create_table(self, TableName: str, KeySchema: list, AttributeDefinitions: list,
+                     ProvisionedThroughput: Optional[dict] = None,
+                     GlobalSecondaryIndexes: Optional[list] = None,
+                     BillingMode: str = 'PROVISIONED', **kwargs) -> dict:
+        with self._backend.lock:
+            if TableName in self._backend.tables:
+                raise _client_error('ResourceInUseException', f'Table already exists: {TableName}', 'CreateTable')
+            description = {
+                'TableName': TableName,
+                'TableStatus': 'ACTIVE',
+                'KeySchema': KeySchema,
+                'AttributeDefinitions': AttributeDefinitions,
+                'ProvisionedThroughput': ProvisionedThroughput or {},
+                'BillingModeSummary': {'BillingMode': BillingMode},
+                'GlobalSecondaryIndexes': [
+                    {**index, 'IndexStatus': 'ACTIVE'} for index in GlobalSecondaryIndexes or []
+                ],
+            }
+            self._backend.tables[TableName] = TableState(description)
+        return {'TableDescription': copy.deepcopy(description)}
+
+    def update_table(self, TableName: str, GlobalSecondaryIndexUpdates: Optional[list] = None,
+                     BillingMode: Optional[str] = None, **kwargs) -> dict:
+        with self._backend.lock:
+            state = self._backend.get_table_state(TableName, 'UpdateTable')
+            if BillingMode:
+                state.description['BillingModeSummary'] = {'BillingMode': BillingMode}
+            for update in GlobalSecondaryIndexUpdates or []:
+                if 'Create' in update:
+                    state.description['GlobalSecondaryIndexes'].append(
+                        {**update['Create'], 'IndexStatus': 'ACTIVE'}
+                    )
+        return {'TableDescription': copy.deepcopy(state.description)}
+
+    def describe_time_to_live(self, TableName: str) -> dict:
+        state = self._backend.get_table_state(TableName, 'DescribeTimeToLive')
+        return {'TimeToLiveDescription': state.description.get(
+            'TimeToLiveDescription', {'TimeToLiveStatus': 'DISABLED'}
+        )}
+
+    def update_time_to_live(self, TableName: str, TimeToLiveSpecification: dict) -> dict:
+        # Items are never expired in memory; the setting is only recorded.
+        state = self._backend.get_table_state(TableName, 'UpdateTimeToLive')
+        state.description['TimeToLiveDescription'] = {
+            'TimeToLiveStatus': 'ENABLED' if TimeToLiveSpecification['Enabled'] else 'DISABLED',
+            'AttributeName': TimeToLiveSpecification['AttributeName'],
+        }
+        return {'TimeToLiveSpecification': TimeToLiveSpecification}
+
+    def get_waiter(self, name: str):
+        return SimpleNamespace(wait=lambda **kwargs: None)
+
+    def scan(self, TableName: str, **kwargs) -> dict:
+        response = self._backend.Table(TableName).scan(**kwargs)
+        response['Items'] = [
+            {k: _serializer.serialize(v) for k, v in item.items()}
+            for item in response['Items']
+        ]
+        return response
+
+
+# In-process stand-in for the boto3 DynamoDB resource. It implements the
+# subset of the resource/client API the repositories use, with the same
+# request and response shapes, so the pipeline can run and be profiled
+# without AWS. Conditions must be boto3 condition objects, not strings.
+class MemoryBackend:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.tables: dict[str, TableState] = {}
+        self.meta = SimpleNamespace(client=MemoryClient(self))
+
+    def get_table_state(self, name: str, operation: str) -> TableState:
+        state = self.tables.get(name)
+        if state is None:
+            raise _client_error('ResourceNotFoundException',
+                                f'Requested resource not found: Table: {name} not found', operation)
+        return state
+
+    def Table(self, name: str) -> MemoryTable:
+        return MemoryTable(self, name)
+
+    def batch_write_item(self, RequestItems: dict, **kwargs) -> dict:
+        for table_name, requests in RequestItems.items():
+            table = self.Table(table_name)
+            for request in requests:
+                if 'PutRequest' in request:
+                    table.put_item(Item=request['PutRequest']['Item'])
+                elif 'DeleteRequest' in request:
+                    table.delete_item(Key=request['DeleteRequest']['Key'])
+        return {'UnprocessedItems': {}}
+
+    def batch_get_item(self, RequestItems: dict, **kwargs) -> dict:
+        responses = {}
+        for table_name, request in RequestItems.items():
+            state = self.get_table_state(table_name, 'BatchGetItem')
+            with self.lock:
+                items = [
+                    state.items[state.key_of(key)] for key in request['Keys']
+                    if state.key_of(key) in state.items
+                ]
+            responses[table_name] = state.page(items, **request)['Items']
+        return {'Responses': responses, 'UnprocessedKeys': {}}
+
+    def stats(self) -> dict[str, Any]:
+        with self.lock:
+            return {name: len(state.items) for name, state in self.tables.items()}
\ No newline at end of file
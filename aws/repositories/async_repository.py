@@ -0,0 +1,42 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from configs.config import settings
+
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.get('DYNAMO.ASYNC_CONCURRENCY', 8),
+                thread_name_prefix='dynamo'
+            )
+        return _executor
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), functools.partial(func, *args, **kwargs))
+
+
+class AsyncRepository:
+    def __init__(self, repository):
+        self._repository = repository
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._repository, name)
+        if not callable(attr):
+            return attr
+
+        async def call(*args, **kwargs):
+            return await run_blocking(attr, *args, **kwargs)
+
+        return call
\ No newline at end of file
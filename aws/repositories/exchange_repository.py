@@ -1,3 +1,4 @@
+import threading
 from aws.dynamodb_connector import DynamoDBConnector
 from aws.repositories.generic_repository import DynamoRepository
 from aws.tables_schemas import Exchanges
@@ -6,25 +7,60 @@ from models.exchanges import Exchange as model_
 
 class ExchangeRepository(DynamoRepository):
     _connector = None
-    
+    _ids_by_name: dict[str, str] | None = None
+    _ids_by_name_lock = threading.Lock()
+
     def __init__(self):
         if ExchangeRepository._connector is None:
             ExchangeRepository._connector = DynamoDBConnector().initiate_connection()
         super().__init__(ExchangeRepository._connector, Exchanges.table_name)
 
     def get_by_name(self, name: str) -> dict | None:
-        items = self.query_by_attr('name', name)
+        items = self.query_by_index('name', name)
         return items[0] if items else None
 
+    def id_for_name(self, name: str | None) -> str | None:
+        if not name:
+            return None
+        return self._known_ids().get(name)
+
+    def find_by_name(self, name: str | None) -> dict | None:
+        # Names missing from the in-memory map are new exchanges, so only
+        # known ones cost a read.
+        item_id = self.id_for_name(name)
+        return self.get_by_id(item_id) if item_id else None
+
+    def find_many_by_name(self, names: list[str]) -> dict[str, dict]:
+        ids = [item_id for item_id in map(self.id_for_name, names) if item_id]
+        return {item['name']: item for item in self.get_many(ids, concurrent=True).values()}
+
+    def upsert_details(self, exchange: model_, known: dict[str, dict] | None = None) -> tuple[dict, str]:
+        # `known` holds rows prefetched with find_many_by_name; names outside
+        # it fall back to a single lookup.
+        if known is not None and exchange.name in known:
+            existing_item = known[exchange.name]
+        else:
+            existing_item = self.find_by_name(exchange.name)
+        item, outcome = self.save_details(exchange, existing_item)
+        self._known_ids()[item['name']] = item['id']
+        return item, outcome
+
     def create_if_not_exists(self, exchange: model_) -> dict:
-        existing_item = self.get_by_name(exchange.name)
+        existing_item = self.find_by_name(exchange.name)
         if existing_item:
             return existing_item
-    
+
         new_item = exchange.model_dump()
         self.create(new_item)
+        self._known_ids()[new_item['name']] = new_item['id']
         return new_item
 
-    def get_all(self) -> list[dict]:
-        response = self.table.scan()
-        return response.get('Items', [])
\ No newline at end of file
+    def _known_ids(self) -> dict[str, str]:
+        with ExchangeRepository._ids_by_name_lock:
+            if ExchangeRepository._ids_by_name is None:
+                ExchangeRepository._ids_by_name = {
+                    item['name']: item['id']
+                    for item in self.iter_all(projection=['id', 'name'])
+                    if item.get('name')
+                }
+            return ExchangeRepository._ids_by_name
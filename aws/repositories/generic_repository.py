@@ -1,19 +1,493 @@
+import hashlib
+import json
+import queue
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from boto3.dynamodb.conditions import Key, Attr
-from typing import Optional
+from boto3.dynamodb.types import TypeDeserializer
+from botocore.exceptions import ClientError
+from typing import Iterator, Optional
+
+from aws.repositories.key_cache import KeyCache
+from aws.throttling import THROTTLING_ERROR_CODES, get_write_limiter
+from configs.config import settings
+from aws.tables_schemas import index_name, indexed_attributes
+
+WRITTEN = 'written'
+UNCHANGED = 'unchanged'
+FAILED = 'failed'
+
+BATCH_WRITE_SIZE = 25
+BATCH_GET_SIZE = 100
+MAX_BATCH_RETRIES = 5
+BATCH_RETRY_BASE_DELAY = 0.1
+INDEX_UNAVAILABLE_MESSAGES = (
+    'does not have the specified index',
+    'backfilling global secondary index',
+    # DynamoDB-compatible emulators report a missing index this way.
+    'Invalid index',
+)
+NON_CONTENT_FIELDS = {'id', 'created_at', 'updated_at', 'content_hash', 'details_fetched_at'}
+
+
+def content_hash(item: dict) -> str:
+    content = {k: v for k, v in item.items() if k not in NON_CONTENT_FIELDS}
+    payload = json.dumps(content, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()
+
+
+_executors: dict[str, ThreadPoolExecutor] = {}
+_executors_lock = threading.Lock()
+
+
+def shared_executor(name: str, max_workers: int) -> ThreadPoolExecutor:
+    # Long-lived workers, so each keeps its per-thread resource across calls.
+    with _executors_lock:
+        executor = _executors.get(name)
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f'dynamo-{name}')
+            _executors[name] = executor
+        return executor
+
 
 class DynamoRepository:
+    key_cache: KeyCache | None = None
+    key_cache_attr: str | None = None
+    watermark_attr: str | None = None
+    immutable_fields = {'id', 'created_at', 'updated_at'}
+    key_attrs = ('id',)
+
     def __init__(self, conn, table_name: str):
-        self.table = conn.resource.Table(table_name)
+        self.conn = conn
+        self.client = conn.client
+        self.table_name = table_name
+        self.index_keys = set(indexed_attributes(table_name))
+        self.write_limiter = get_write_limiter(table_name, conn.write_capacities.get(table_name))
+
+    @property
+    def resource(self):
+        return self.conn.resource
+
+    @property
+    def table(self):
+        return self.conn.table(self.table_name)
 
     def create(self, item: dict) -> None:
-        self.table.put_item(Item=item)
+        self.write(self.table.put_item, Item=self.storable(item))
+
+    def storable(self, item: dict) -> dict:
+        # DynamoDB rejects a null or empty index key; without the attribute
+        # the item is simply left out of that index.
+        return {k: v for k, v in item.items() if k not in self.index_keys or v not in (None, '')}
+
+    def write(self, operation, units: float = 1, **kwargs) -> dict:
+        for attempt in range(MAX_BATCH_RETRIES + 1):
+            self.write_limiter.acquire(units)
+            self.conn.take_throttles()
+            try:
+                response = operation(**kwargs)
+            except ClientError as e:
+                self.conn.take_throttles()
+                if e.response['Error']['Code'] in THROTTLING_ERROR_CODES and attempt < MAX_BATCH_RETRIES:
+                    self.write_limiter.on_throttle()
+                    continue
+                raise
+            self._settle_write()
+            return response
+
+    def _settle_write(self) -> None:
+        # botocore retries throttled calls on its own before they succeed;
+        # those still count as throttles so the limiter backs off.
+        if self.conn.take_throttles():
+            self.write_limiter.on_throttle()
+        else:
+            self.write_limiter.on_success()
 
     def get_by_id(self, item_id: str) -> Optional[dict]:
         response = self.table.get_item(Key={'id': item_id})
         return response.get('Item')
 
+    def iter_all(self, projection: Optional[list[str]] = None,
+                 page_size: Optional[int] = None,
+                 segments: Optional[int] = None) -> Iterator[dict]:
+        if segments and segments > 1:
+            yield from self.parallel_scan(segments, projection, page_size)
+            return
+
+        scan_kwargs = self._projection_kwargs(projection)
+        if page_size:
+            scan_kwargs['Limit'] = page_size
+
+        yield from self._paginate(self.table.scan, scan_kwargs)
+
+    def iter_query(self, **query_kwargs) -> Iterator[dict]:
+        yield from self._paginate(self.table.query, query_kwargs)
+
+    def _paginate(self, operation, kwargs: dict) -> Iterator[dict]:
+        while True:
+            response = operation(**kwargs)
+            yield from response.get('Items', [])
+            if 'LastEvaluatedKey' not in response:
+                break
+            kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+
+    def parallel_scan(self, segments: Optional[int] = None,
+                      projection: Optional[list[str]] = None,
+                      page_size: Optional[int] = None) -> Iterator[dict]:
+        segments = segments or settings.get('DYNAMO.SCAN_SEGMENTS', 4)
+        pages = queue.Queue(maxsize=segments * 2)
+        stop = threading.Event()
+        segment_done = object()
+
+        def publish(page) -> bool:
+            while not stop.is_set():
+                try:
+                    pages.put(page, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def scan_segment(segment: int):
+            # boto3 resources are not thread-safe, so segments go through the
+            # shared low-level client and deserialize the items themselves.
+            deserializer = TypeDeserializer()
+            scan_kwargs = {
+                'TableName': self.table_name,
+                'Segment': segment,
+                'TotalSegments': segments,
+                **self._projection_kwargs(projection)
+            }
+            if page_size:
+                scan_kwargs['Limit'] = page_size
+
+            try:
+                while not stop.is_set():
+                    response = self.client.scan(**scan_kwargs)
+                    page = [
+                        {k: deserializer.deserialize(v) for k, v in item.items()}
+                        for item in response.get('Items', [])
+                    ]
+                    if page and not publish(page):
+                        return
+                    if 'LastEvaluatedKey' not in response:
+                        break
+                    scan_kwargs['ExclusiveStartKey'] = response['LastEvaluatedKey']
+            except Exception as e:
+                publish(e)
+            finally:
+                publish(segment_done)
+
+        with ThreadPoolExecutor(max_workers=segments) as executor:
+            for segment in range(segments):
+                executor.submit(scan_segment, segment)
+
+            try:
+                finished = 0
+                while finished < segments:
+                    page = pages.get()
+                    if page is segment_done:
+                        finished += 1
+                    elif isinstance(page, Exception):
+                        raise page
+                    else:
+                        yield from page
+            finally:
+                stop.set()
+
+    def get_all(self) -> list[dict]:
+        return list(self.iter_all())
+
+    def _projection_kwargs(self, projection: Optional[list[str]]) -> dict:
+        if not projection:
+            return {}
+        names = {f"#p{i}": attr for i, attr in enumerate(projection)}
+        return {
+            'ProjectionExpression': ", ".join(names),
+            'ExpressionAttributeNames': names
+        }
+
+    def get_many(self, ids: list[str], projection: Optional[list[str]] = None,
+                 concurrent: bool = False) -> dict[str, dict]:
+        if projection and 'id' not in projection:
+            projection = ['id', *projection]
+
+        unique_ids = list(dict.fromkeys(ids))
+        chunks = [
+            unique_ids[start:start + BATCH_GET_SIZE]
+            for start in range(0, len(unique_ids), BATCH_GET_SIZE)
+        ]
+
+        if concurrent and len(chunks) > 1:
+            executor = shared_executor('batch-get', settings.get('DYNAMO.BATCH_GET_CONCURRENCY', 4))
+            results = list(executor.map(lambda chunk: self._get_chunk(chunk, projection), chunks))
+        else:
+            results = [self._get_chunk(chunk, projection) for chunk in chunks]
+
+        return {item['id']: item for items in results for item in items}
+
+    def _get_chunk(self, ids: list[str], projection: Optional[list[str]]) -> list[dict]:
+        request = {'Keys': [{'id': item_id} for item_id in ids], **self._projection_kwargs(projection)}
+        items = []
+
+        for attempt in range(MAX_BATCH_RETRIES + 1):
+            if attempt:
+                time.sleep(BATCH_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+            try:
+                response = self.resource.batch_get_item(RequestItems={self.table_name: request})
+            except ClientError as e:
+                if e.response['Error']['Code'] in THROTTLING_ERROR_CODES:
+                    continue
+                raise
+
+            items.extend(response.get('Responses', {}).get(self.table_name, []))
+            unprocessed = response.get('UnprocessedKeys', {}).get(self.table_name)
+            if not unprocessed:
+                return items
+            request = unprocessed
+
+        print(f"Giving up on {len(request['Keys'])} unprocessed keys in {self.table_name}")
+        return items
+
     def query_by_attr(self, attr_name: str, value: str) -> list[dict]:
-        response = self.table.scan(
-            FilterExpression=Attr(attr_name).eq(value)
+        return list(self._paginate(self.table.scan, {'FilterExpression': Attr(attr_name).eq(value)}))
+
+    def query_by_index(self, attr_name: str, value: str) -> list[dict]:
+        try:
+            return list(self.iter_query(
+                IndexName=index_name(attr_name),
+                KeyConditionExpression=Key(attr_name).eq(value)
+            ))
+        except ClientError as e:
+            # Only a missing index, or one still backfilling right after it
+            # was added, falls back to a scan.
+            error = e.response['Error']
+            if error['Code'] in ('ValidationException', 'ResourceNotFoundException') and any(
+                message in error.get('Message', '') for message in INDEX_UNAVAILABLE_MESSAGES
+            ):
+                return self.query_by_attr(attr_name, value)
+            raise
+
+    def find_cached(self, key: str) -> Optional[dict]:
+        self._warm_key_cache()
+        item = self.key_cache.get(key)
+        if item is None:
+            items = self.query_by_index(self.key_cache_attr, key)
+            if items:
+                item = items[0]
+                self.key_cache.put(key, item)
+        return item
+
+    def remember(self, item: dict) -> None:
+        key = item.get(self.key_cache_attr)
+        if key:
+            self.key_cache.put(str(key), item)
+
+    def forget(self, key: Optional[str] = None) -> None:
+        self.key_cache.invalidate(key)
+
+    def _warm_key_cache(self) -> None:
+        if self.key_cache.warmed:
+            return
+
+        self.key_cache.fill(
+            (str(item[self.key_cache_attr]), item)
+            for item in self.iter_all() if item.get(self.key_cache_attr)
         )
-        return response.get('Items', [])
\ No newline at end of file
+
+    def find_existing(self, new_item: dict) -> Optional[dict]:
+        return self.find_cached(str(new_item[self.key_cache_attr]))
+
+    def is_unchanged(self, existing_item: dict, new_item: dict) -> bool:
+        if existing_item.get('content_hash') == new_item['content_hash']:
+            return True
+        watermark = new_item.get(self.watermark_attr) if self.watermark_attr else None
+        return watermark is not None and existing_item.get(self.watermark_attr) == watermark
+
+    def change_condition(self, new_item: dict):
+        condition = Attr('content_hash').not_exists() | Attr('content_hash').ne(new_item['content_hash'])
+        if self.watermark_attr and new_item.get(self.watermark_attr) is not None:
+            condition = condition & (
+                Attr(self.watermark_attr).not_exists()
+                | Attr(self.watermark_attr).lt(new_item[self.watermark_attr])
+            )
+        return condition
+
+    def refresh_expired(self) -> None:
+        # Expired cache entries are re-read in bulk by id instead of falling
+        # back to one index query per key on the next lookup.
+        expired_items = self.key_cache.pop_expired()
+        if not expired_items:
+            return
+
+        fresh_items = self.get_many([item['id'] for item in expired_items], concurrent=True)
+        for item in fresh_items.values():
+            self.remember(item)
+
+    def upsert_items(self, new_items: list[dict]) -> list[str]:
+        self.refresh_expired()
+        outcomes = [UNCHANGED] * len(new_items)
+        changed = []
+
+        # Items sharing a key would race each other in the write pool, so
+        # only the last one for each key is written.
+        latest = {str(new_item[self.key_cache_attr]): position for position, new_item in enumerate(new_items)}
+        for position in sorted(latest.values()):
+            new_item = new_items[position]
+            new_item['content_hash'] = content_hash(new_item)
+            existing_item = self.find_existing(new_item)
+            if existing_item and self.is_unchanged(existing_item, new_item):
+                continue
+            changed.append((position, new_item, existing_item))
+
+        # The in-memory watermark keeps unchanged rows away from DynamoDB;
+        # changed ones are conditional writes, so a row that is already as
+        # new elsewhere is left alone without a read.
+        executor = shared_executor('writes', settings.get('DYNAMO.WRITE_CONCURRENCY', 8))
+        results = executor.map(lambda change: self.write_change(change[1], change[2]), changed)
+        for (position, new_item, _), (item, outcome) in zip(changed, results):
+            outcomes[position] = outcome
+            if outcome == WRITTEN:
+                self.remember(item)
+            else:
+                self.forget(str(new_item[self.key_cache_attr]))
+
+        return outcomes
+
+    def write_change(self, new_item: dict, existing_item: dict | None) -> tuple[dict, str]:
+        try:
+            if not existing_item:
+                self.write(self.table.put_item, Item=self.storable(new_item),
+                           ConditionExpression=self.change_condition(new_item))
+                return new_item, WRITTEN
+
+            changes = {
+                field: value for field, value in self.storable(new_item).items()
+                if field not in self.immutable_fields and value is not None and existing_item.get(field) != value
+            }
+            if not changes:
+                return existing_item, UNCHANGED
+            changes['updated_at'] = str(datetime.now())
+
+            names = {f"#f{i}": field for i, field in enumerate(changes)}
+            values = {f":v{i}": value for i, value in enumerate(changes.values())}
+            self.write(
+                self.table.update_item,
+                Key={attr: existing_item[attr] for attr in self.key_attrs},
+                UpdateExpression="SET " + ", ".join(f"#f{i} = :v{i}" for i in range(len(changes))),
+                ConditionExpression=self.change_condition(new_item),
+                ExpressionAttributeNames=names,
+                ExpressionAttributeValues=values
+            )
+            return {**existing_item, **changes}, WRITTEN
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'ConditionalCheckFailedException':
+                return new_item, UNCHANGED
+            print(f"Error writing to {self.table_name}: {e}")
+            return new_item, FAILED
+        except Exception as e:
+            print(f"Error writing to {self.table_name}: {e}")
+            return new_item, FAILED
+
+    def save_details(self, model, existing_item: dict | None) -> tuple[dict, str]:
+        # Only the fields the source actually provided are compared and
+        # merged, so attributes maintained elsewhere are left untouched.
+        fetched_at = str(datetime.now())
+        details = model.model_dump(exclude_unset=True)
+        details_hash = content_hash(details)
+
+        if not existing_item:
+            new_item = {**model.model_dump(), 'content_hash': details_hash, 'details_fetched_at': fetched_at}
+            self.create(new_item)
+            return new_item, WRITTEN
+
+        if existing_item.get('content_hash') == details_hash:
+            self.write(
+                self.table.update_item,
+                Key={attr: existing_item[attr] for attr in self.key_attrs},
+                UpdateExpression="SET #details_fetched_at = :details_fetched_at",
+                ExpressionAttributeNames={"#details_fetched_at": "details_fetched_at"},
+                ExpressionAttributeValues={":details_fetched_at": fetched_at}
+            )
+            return {**existing_item, 'details_fetched_at': fetched_at}, UNCHANGED
+
+        details.update(content_hash=details_hash, details_fetched_at=fetched_at)
+        merged_item = self._merge_with_existing(details, existing_item)
+        self.create(merged_item)
+        return merged_item, WRITTEN
+
+    def _merge_with_existing(self, new_item: dict, existing_item: dict | None) -> dict | None:
+        if not existing_item:
+            return new_item
+
+        merged_item = dict(existing_item)
+        changed = False
+
+        for field, value in new_item.items():
+            if field not in self.immutable_fields and value is not None:
+                if existing_item.get(field) != value:
+                    merged_item[field] = value
+                    changed = True
+
+        if not changed:
+            return None
+
+        merged_item['updated_at'] = str(datetime.now())
+        return merged_item
+
+    def batch_put(self, items: list[dict]) -> list[str]:
+        outcomes = [FAILED] * len(items)
+
+        # BatchWriteItem rejects a request that touches the same key twice,
+        # so only the last version of each item is sent.
+        positions: dict[tuple, list[int]] = {}
+        for position, item in enumerate(items):
+            positions.setdefault(self._item_key(item), []).append(position)
+        unique_items = [items[indexes[-1]] for indexes in positions.values()]
+
+        for start in range(0, len(unique_items), BATCH_WRITE_SIZE):
+            chunk = unique_items[start:start + BATCH_WRITE_SIZE]
+            failed_keys = {self._item_key(item) for item in self._write_chunk(chunk)}
+            for item in chunk:
+                key = self._item_key(item)
+                outcome = FAILED if key in failed_keys else WRITTEN
+                for position in positions[key]:
+                    outcomes[position] = outcome
+
+        return outcomes
+
+    def _item_key(self, item: dict) -> tuple:
+        return tuple(item[attr] for attr in self.key_attrs)
+
+    def _write_chunk(self, chunk: list[dict]) -> list[dict]:
+        pending = [{'PutRequest': {'Item': self.storable(item)}} for item in chunk]
+
+        for attempt in range(MAX_BATCH_RETRIES + 1):
+            if attempt:
+                time.sleep(BATCH_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+            self.write_limiter.acquire(len(pending))
+            self.conn.take_throttles()
+            try:
+                response = self.resource.batch_write_item(
+                    RequestItems={self.table_name: pending}
+                )
+            except ClientError as e:
+                self.conn.take_throttles()
+                if e.response['Error']['Code'] in THROTTLING_ERROR_CODES:
+                    self.write_limiter.on_throttle()
+                    continue
+                print(f"Error writing batch to {self.table_name}: {e}")
+                return chunk
+
+            pending = response.get('UnprocessedItems', {}).get(self.table_name, [])
+            if not pending:
+                self._settle_write()
+                return []
+            # Unprocessed items are DynamoDB's way of reporting throttling
+            # inside a batch.
+            self.write_limiter.on_throttle()
+
+        print(f"Giving up on {len(pending)} unprocessed items in {self.table_name}")
+        return [request['PutRequest']['Item'] for request in pending]
\ No newline at end of file
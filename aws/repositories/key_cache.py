@@ -0,0 +1,61 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+from configs.config import settings
+
+
+class KeyCache:
+    def __init__(self, ttl_seconds: Optional[float] = None, max_size: Optional[int] = None):
+        self.ttl_seconds = ttl_seconds or settings.get('CACHE.KEY_TTL_SECONDS', 3600)
+        self.max_size = max_size or settings.get('CACHE.KEY_MAX_SIZE', 20000)
+        self.warmed = False
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            stored_at, item = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return item
+
+    def put(self, key: str, item: dict) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), item)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def pop_expired(self) -> list[dict]:
+        with self._lock:
+            now = time.monotonic()
+            expired_keys = [
+                key for key, (stored_at, _) in self._entries.items()
+                if now - stored_at > self.ttl_seconds
+            ]
+            return [self._entries.pop(key)[1] for key in expired_keys]
+
+    def fill(self, items: Iterable[tuple[str, dict]]) -> None:
+        for key, item in items:
+            self.put(key, item)
+        self.warmed = True
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self.warmed = False
+            else:
+                self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
\ No newline at end of file
@@ -1,11 +1,16 @@
+import threading
+from boto3.dynamodb.conditions import Attr
+from botocore.exceptions import ClientError
 from aws.dynamodb_connector import DynamoDBConnector
-from aws.repositories.generic_repository import DynamoRepository
+from aws.repositories.generic_repository import DynamoRepository, UNCHANGED, WRITTEN
 from aws.tables_schemas import TokenPlatform
 
-from models.platform import Platform as model_
+from models.platform import Platform as model_, platform_id
 
 class PlatformRepository(DynamoRepository):
     _connector = None
+    _known_ids: set[str] | None = None
+    _known_ids_lock = threading.Lock()
     
     def __init__(self):
         if PlatformRepository._connector is None:
@@ -13,14 +18,54 @@ class PlatformRepository(DynamoRepository):
         super().__init__(PlatformRepository._connector, TokenPlatform.table_name)
 
     def get_by_address(self, address: str) -> dict | None:
-        items = self.query_by_attr('token_address', address)
+        items = self.query_by_index('token_address', address)
         return items[0] if items else None
 
     def create_if_not_exists(self, platform: model_) -> dict:
-        item = self.get_by_address(str(platform.token_address))
-        if item:
-            return item
-        
         new_item = platform.model_dump()
-        self.create(new_item)
-        return new_item
\ No newline at end of file
+        if self._is_known(new_item['id']):
+            return new_item
+
+        try:
+            self.write(self.table.put_item, Item=self.storable(new_item), ConditionExpression=Attr('id').not_exists())
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'ConditionalCheckFailedException':
+                raise
+        self._known().add(new_item['id'])
+        return new_item
+
+    def save_many(self, platforms: list[model_]) -> list[str]:
+        outcomes = [UNCHANGED] * len(platforms)
+        items_to_write = []
+        positions = []
+
+        for position, platform in enumerate(platforms):
+            item = platform.model_dump()
+            if not self._is_known(item['id']):
+                items_to_write.append(item)
+                positions.append(position)
+
+        # Keys are derived from chain + address, so re-putting a row that
+        # already exists only rewrites the same data.
+        for position, item, outcome in zip(positions, items_to_write, self.batch_put(items_to_write)):
+            outcomes[position] = outcome
+            if outcome == WRITTEN:
+                self._known().add(item['id'])
+
+        return outcomes
+
+    def _is_known(self, item_id: str) -> bool:
+        return item_id in self._known()
+
+    def _known(self) -> set[str]:
+        with PlatformRepository._known_ids_lock:
+            if PlatformRepository._known_ids is None:
+                known_ids = set()
+                for item in self.iter_all(projection=['id', 'name', 'token_address']):
+                    known_ids.add(item['id'])
+                    # Rows written before ids were derived still count as
+                    # known under their derived id.
+                    if item.get('name') and item.get('token_address'):
+                        known_ids.add(str(platform_id(item['name'], item['token_address'])))
+                PlatformRepository._known_ids = known_ids
+            return PlatformRepository._known_ids
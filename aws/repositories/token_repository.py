@@ -13,29 +13,38 @@ class TokensRepository(DynamoRepository):
         super().__init__(TokensRepository._connector, Tokens.table_name)
 
     def get_by_symbol(self, symbol: str) -> dict | None:
-        items = self.query_by_attr('symbol', symbol)
+        items = self.query_by_index('symbol', symbol)
         return items[0] if items else None
 
     def get_by_coingecko_id(self, coingecko_id: str) -> dict | None:
-        items = self.query_by_attr('coingecko_id', coingecko_id)
+        items = self.query_by_index('coingecko_id', coingecko_id)
         return items[0] if items else None
 
-    def create_if_not_exists(self, token: model_) -> dict:
+    def find_matching(self, token: model_) -> dict | None:
         existing_item = None
         
         if token.coingecko_id:
             existing_item = self.get_by_coingecko_id(token.coingecko_id)
         
+        # Symbols are shared between coins, so a symbol match only counts
+        # for legacy rows that were stored without a coingecko_id.
         if not existing_item and token.symbol:
-            existing_item = self.get_by_symbol(token.symbol)
-        
+            existing_item = next(
+                (item for item in self.query_by_index('symbol', token.symbol)
+                 if not item.get('coingecko_id') or not token.coingecko_id),
+                None
+            )
+
+        return existing_item
+
+    def upsert_details(self, token: model_) -> tuple[dict, str]:
+        return self.save_details(token, self.find_matching(token))
+
+    def create_if_not_exists(self, token: model_) -> dict:
+        existing_item = self.find_matching(token)
         if existing_item:
             return existing_item
     
         new_item = token.model_dump()
         self.create(new_item)
-        return new_item
-
-    def get_all(self) -> list[dict]:
-        response = self.table.scan()
-        return response.get('Items', [])
\ No newline at end of file
+        return new_item
\ No newline at end of file
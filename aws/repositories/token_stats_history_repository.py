@@ -0,0 +1,47 @@
+from boto3.dynamodb.conditions import Key
+from aws.dynamodb_connector import DynamoDBConnector
+from aws.repositories.generic_repository import DynamoRepository
+from aws.tables_schemas import TokenStatsHistory
+from aws.throttling import LIVE_BUDGET, get_write_limiter
+from configs.config import settings
+
+from models.token_stats_history import TokenStatsPoint as model_
+
+class TokenStatsHistoryRepository(DynamoRepository):
+    _connector = None
+    key_attrs = ('coingecko_id', 'timestamp')
+
+    def __init__(self, write_budget: str = LIVE_BUDGET, write_share: float = 1.0):
+        if TokenStatsHistoryRepository._connector is None:
+            TokenStatsHistoryRepository._connector = DynamoDBConnector().initiate_connection()
+        super().__init__(TokenStatsHistoryRepository._connector, TokenStatsHistory.table_name)
+        if write_budget != LIVE_BUDGET:
+            self.write_limiter = get_write_limiter(
+                self.table_name, self.conn.write_capacities.get(self.table_name), write_budget, write_share
+            )
+        self.retention_seconds = int(settings.get('HISTORY.RETENTION_DAYS', 30)) * 86400
+
+    def append_many(self, points: list[model_]) -> list[str]:
+        return self.append_records([point.model_dump() for point in points])
+
+    def append_records(self, records: list[dict], retention_seconds: int | None = None) -> list[str]:
+        retention_seconds = retention_seconds or self.retention_seconds
+        items = []
+        for item in records:
+            if item.get('expires_at') is None:
+                item['expires_at'] = item['timestamp'] + retention_seconds
+            items.append({k: v for k, v in item.items() if v is not None})
+        return self.batch_put(items)
+
+    def range(self, coingecko_id: str, start: int, end: int) -> list[dict]:
+        return list(self.iter_query(
+            KeyConditionExpression=Key('coingecko_id').eq(coingecko_id) & Key('timestamp').between(start, end)
+        ))
+
+    def latest(self, coingecko_id: str, count: int = 1) -> list[dict]:
+        response = self.table.query(
+            KeyConditionExpression=Key('coingecko_id').eq(coingecko_id),
+            ScanIndexForward=False,
+            Limit=count
+        )
+        return response.get('Items', [])
\ No newline at end of file
@@ -1,3 +1,27 @@
+def index_name(attribute_name: str) -> str:
+    return f'{attribute_name}-index'
+
+
+PROVISIONED = 'PROVISIONED'
+PAY_PER_REQUEST = 'PAY_PER_REQUEST'
+
+
+def global_secondary_index(attribute_name: str, provisioned: bool = True) -> dict:
+    index = {
+        'IndexName': index_name(attribute_name),
+        'KeySchema': [
+            {"AttributeName": attribute_name, "KeyType": "HASH"},
+        ],
+        'Projection': {'ProjectionType': 'ALL'},
+    }
+    if provisioned:
+        index['ProvisionedThroughput'] = {
+            'ReadCapacityUnits': 5,
+            'WriteCapacityUnits': 5
+        }
+    return index
+
+
 class BaseTableSchema:
     attribute_definitions = [
         {"AttributeName": "id", "AttributeType": "S"},
@@ -9,32 +33,84 @@ class BaseTableSchema:
         'ReadCapacityUnits': 5,
         'WriteCapacityUnits': 5
     }
+    billing_mode = PROVISIONED
+    indexed_attributes = []
+    ttl_attribute = None
+
+    @classmethod
+    def get_attribute_definitions(cls) -> list[dict]:
+        definitions = list(cls.attribute_definitions)
+        defined = {d['AttributeName'] for d in definitions}
+        for attribute_name in cls.indexed_attributes:
+            if attribute_name not in defined:
+                definitions.append({"AttributeName": attribute_name, "AttributeType": "S"})
+                defined.add(attribute_name)
+        return definitions
+
+    @classmethod
+    def get_global_secondary_indexes(cls) -> list[dict]:
+        provisioned = cls.billing_mode == PROVISIONED
+        return [global_secondary_index(attr, provisioned) for attr in cls.indexed_attributes]
+
+    @classmethod
+    def get_billing_params(cls) -> dict:
+        if cls.billing_mode == PAY_PER_REQUEST:
+            return {'BillingMode': PAY_PER_REQUEST}
+        return {'ProvisionedThroughput': cls.provisioned_throughput}
 
 
 class Tokens(BaseTableSchema):
     table_name = 'LiberandumAggregationToken'
+    indexed_attributes = ['coingecko_id', 'symbol']
 
 
 class TokenPlatform(BaseTableSchema):
     table_name = 'LiberandumAggregationTokenPlatform'
+    indexed_attributes = ['token_address']
 
 
 class TokenStats(BaseTableSchema):
     table_name = 'LiberandumAggregationTokenStats'
+    indexed_attributes = ['symbol', 'coingecko_id']
 
 
 class Exchanges(BaseTableSchema):
     table_name = 'LiberandumAggregationExchanges'
+    indexed_attributes = ['name']
 
 
 class ExchangesStats(BaseTableSchema):
     table_name = 'LiberandumAggregationExchangesStats'
+    indexed_attributes = ['exchange_id', 'name']
+
+
+class TokenStatsHistory(BaseTableSchema):
+    table_name = 'LiberandumAggregationTokenStatsHistory'
+    attribute_definitions = [
+        {"AttributeName": "coingecko_id", "AttributeType": "S"},
+        {"AttributeName": "timestamp", "AttributeType": "N"},
+    ]
+    key_schema = [
+        {"AttributeName": "coingecko_id", "KeyType": "HASH"},
+        {"AttributeName": "timestamp", "KeyType": "RANGE"},
+    ]
+    # Every tick appends a row per coin (~17 writes/s at 500 coins every
+    # 30s), far beyond the default 5 WCU.
+    billing_mode = PAY_PER_REQUEST
+    ttl_attribute = 'expires_at'
 
 
 TABLE_SCHEMAS = [
     Tokens,
-    TokenStats, 
+    TokenStats,
     TokenPlatform,
     Exchanges,
-    ExchangesStats
-]
\ No newline at end of file
+    ExchangesStats,
+    TokenStatsHistory
+]
+
+def indexed_attributes(table_name: str) -> list[str]:
+    for table_schema in TABLE_SCHEMAS:
+        if table_schema.table_name == table_name:
+            return list(table_schema.indexed_attributes)
+    return []
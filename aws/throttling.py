@@ -0,0 +1,116 @@
+import threading
+import time
+from typing import Optional
+
+from aws.tables_schemas import PAY_PER_REQUEST, TABLE_SCHEMAS
+from configs.config import settings
+
+
+THROTTLING_ERROR_CODES = {
+    'ProvisionedThroughputExceededException',
+    'ThrottlingException',
+    'RequestLimitExceeded',
+}
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, rate: float, min_rate: float = 1.0, max_rate: float = 1000.0,
+                 increase_step: float = 1.0, decrease_factor: float = 0.5):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max(max_rate, rate)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.throttle_count = 0
+        self.yielding: list['AdaptiveRateLimiter'] = []
+
+        self._tokens = rate
+        self._last_refill = time.monotonic()
+        self._last_increase = self._last_refill
+        self._lock = threading.Lock()
+
+    def acquire(self, units: float = 1.0) -> None:
+        while True:
+            with self._lock:
+                self._refill()
+                # A request larger than the bucket would never fit, so it
+                # only waits for the bucket to be full.
+                needed = min(units, self.rate)
+                if self._tokens >= needed:
+                    self._tokens -= units
+                    return
+                wait = (needed - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self) -> None:
+        # The rate grows by increase_step per second of successful writes,
+        # however many writes that second held. Idle gaps do not count.
+        with self._lock:
+            now = time.monotonic()
+            elapsed = min(now - self._last_increase, 1.0)
+            self.rate = min(self.max_rate, self.rate + self.increase_step * elapsed)
+            self._last_increase = now
+
+    def on_throttle(self) -> None:
+        with self._lock:
+            self.throttle_count += 1
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._tokens = min(self._tokens, 0.0)
+            self._last_increase = time.monotonic()
+        for limiter in self.yielding:
+            limiter.on_throttle()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.rate, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+
+LIVE_BUDGET = 'live'
+
+_write_limiters: dict[tuple[str, str], AdaptiveRateLimiter] = {}
+_write_limiters_lock = threading.Lock()
+
+
+def _provisioned_write_capacity(table_name: str) -> float:
+    for table_schema in TABLE_SCHEMAS:
+        if table_schema.table_name == table_name:
+            if table_schema.billing_mode == PAY_PER_REQUEST:
+                return 0.0
+            return float(table_schema.provisioned_throughput['WriteCapacityUnits'])
+    return float(settings.get('DYNAMO.DEFAULT_WRITE_RATE', 5))
+
+
+def get_write_limiter(table_name: str, write_capacity: Optional[float] = None,
+                      budget: str = LIVE_BUDGET, share: float = 1.0) -> AdaptiveRateLimiter:
+    # write_capacity is what the connector observed on the live table: None
+    # when unknown, 0 for on-demand tables that have no fixed capacity.
+    # Budgets other than the live one get `share` of it and yield to it:
+    # when live writes are throttled, they back off as well. Provisioned
+    # tables never probe past their capacity.
+    if write_capacity is None:
+        write_capacity = _provisioned_write_capacity(table_name)
+    max_rate = write_capacity or settings.get('DYNAMO.MAX_WRITE_RATE', 1000)
+
+    with _write_limiters_lock:
+        live = _limiter(table_name, LIVE_BUDGET, write_capacity or max_rate, max_rate)
+        if budget == LIVE_BUDGET:
+            return live
+
+        limiter = _write_limiters.get((table_name, budget))
+        if limiter is None:
+            limiter = _limiter(table_name, budget, (write_capacity or max_rate) * share, max_rate * share)
+            live.yielding.append(limiter)
+        return limiter
+
+
+def _limiter(table_name: str, budget: str, rate: float, max_rate: float) -> AdaptiveRateLimiter:
+    limiter = _write_limiters.get((table_name, budget))
+    if limiter is None:
+        limiter = AdaptiveRateLimiter(
+            rate=rate,
+            min_rate=settings.get('DYNAMO.MIN_WRITE_RATE', 1),
+            max_rate=max_rate
+        )
+        _write_limiters[(table_name, budget)] = limiter
+    return limiter
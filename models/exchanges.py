@@ -27,6 +27,9 @@ class Exchange(BaseModel):
     security_audits:        List[UUID] = Field(default=[])
     related_people:         List[UUID]  = Field(default=[])
 
+    content_hash:           str | None = Field(default=None)
+    details_fetched_at:     str | None = Field(default=None)
+
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
     is_deleted: bool = Field(default=False)
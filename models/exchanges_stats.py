@@ -20,6 +20,8 @@ class ExchangesStats(BaseModel):
     list_supported: List[str] = Field(default=[])
     coins_count: int | None = Field(default=None)
     effective_liquidity_24h: Decimal | None = Field(default=None)
+
+    content_hash: str | None = Field(default=None)
     
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
@@ -1,8 +1,15 @@
-from uuid import UUID, uuid4
-from pydantic import BaseModel, Field, field_serializer
+from uuid import UUID, uuid4, uuid5
+from pydantic import BaseModel, Field, field_serializer, model_validator
 
 from datetime import datetime
 
+PLATFORM_NAMESPACE = UUID('6f1c9f5e-3b1a-4c55-9d8e-5a7a2f0c1b42')
+
+
+def platform_id(name: str, token_address: str) -> UUID:
+    return uuid5(PLATFORM_NAMESPACE, f"{name}:{token_address.strip()}")
+
+
 class Platform(BaseModel):
     id: UUID = Field(default_factory=uuid4)
 
@@ -15,6 +22,15 @@ class Platform(BaseModel):
     updated_at: datetime = Field(default_factory=datetime.now)
     is_deleted: bool = Field(default=False)
 
+    @model_validator(mode='before')
+    @classmethod
+    def derive_id(cls, data):
+        # The id is derived from chain + address so the same platform row is
+        # always written under the same key.
+        if isinstance(data, dict) and 'id' not in data and data.get('name') and data.get('token_address'):
+            data = {**data, 'id': platform_id(data['name'], data['token_address'])}
+        return data
+
     @field_serializer('id', 'created_at', 'updated_at', 'token_id')
     def serialize_id(self, id: UUID, _info):
-        return str(id)
\ No newline at end of file
+        return str(id)
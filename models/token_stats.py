@@ -22,6 +22,11 @@ class TokenStats(BaseModel):
     atl: Union[Decimal, str, None] = Field(default=None)
     liquidity_score: Union[Decimal, str, None] = Field(default=None)
     tvl: Union[Decimal, str, None] = Field(default=None)
+    vwap_24h: Union[Decimal, str, None] = Field(default=None)
+    volatility_24h: Union[Decimal, str, None] = Field(default=None)
+
+    source_updated_at: str | None = Field(default=None)
+    content_hash: str | None = Field(default=None)
     
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
@@ -0,0 +1,15 @@
+from decimal import Decimal
+from typing import Union
+from pydantic import BaseModel, Field
+
+class TokenStatsPoint(BaseModel):
+    coingecko_id: str
+    timestamp: int
+
+    symbol: str
+    price: Union[Decimal, str, None] = Field(default=None)
+    market_cap: Union[Decimal, str, None] = Field(default=None)
+    trading_volume_24h: Union[Decimal, str, None] = Field(default=None)
+    volume_24h_change_24h: Union[Decimal, str, None] = Field(default=None)
+
+    expires_at: int | None = Field(default=None)
@@ -28,6 +28,9 @@ class Token(BaseModel):
 
     avatar_image: str | None = Field(default=None)
 
+    content_hash: str | None = Field(default=None)
+    details_fetched_at: str | None = Field(default=None)
+
     created_at: datetime = Field(default_factory=datetime.now)
     updated_at: datetime = Field(default_factory=datetime.now)
     is_deleted: bool = Field(default=False)
@@ -1,31 +1,49 @@
-import schedule
+import asyncio
 import threading
 import time
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 
 
 class TaskScheduler:
     def __init__(self, log_list: List[str]):
         self.thread = None
-        self.stop_flag = False
+        self.loop = None
         self.log_list = log_list
         self.initial_load_done = False
 
-    def start(self, interval_tokens_seconds: int = 30, 
-              interval_exchanges_hours: int = 1, 
+        self._job_loops: Dict[str, asyncio.AbstractEventLoop] = {}
+        self._job_loops_lock = threading.Lock()
+        # start() and stop() hand the loop over under this lock, so a stop
+        # that lands before the loop thread is running still shuts it down.
+        self._state_lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def start(self, interval_tokens_seconds: int = 30,
+              interval_exchanges_hours: int = 1,
               interval_details_hours: int = 24):
-        self._reset_scheduler()
+        with self._state_lock:
+            if self.loop is not None:
+                return
+            self._stopping.clear()
+
         self._log_startup(interval_tokens_seconds, interval_exchanges_hours, interval_details_hours)
-        
+
         if not self.initial_load_done:
             self._run_initial_load()
-        
-        self._schedule_tasks(interval_tokens_seconds, interval_exchanges_hours, interval_details_hours)
-        self._start_thread()
 
-    def _reset_scheduler(self):
-        self.stop_flag = False
-        schedule.clear()
+        with self._state_lock:
+            if self._stopping.is_set() or self.loop is not None:
+                return
+            self._start_loop()
+            asyncio.run_coroutine_threadsafe(
+                self._run_lanes({
+                    "tokens": interval_tokens_seconds,
+                    "exchanges": interval_exchanges_hours * 3600,
+                    "details": interval_details_hours * 3600,
+                }),
+                self.loop
+            )
 
     def _log_startup(self, tokens_interval: int, exchanges_interval: int, details_interval: int):
         timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
@@ -44,37 +62,87 @@ class TaskScheduler:
             timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
             self.log_list.append(f"[{timestamp}] Ошибка начальной загрузки: {str(e)}")
 
-    def _schedule_tasks(self, tokens_interval: int, exchanges_interval: int, details_interval: int):
-        schedule.every(tokens_interval).seconds.do(self.task_wrapper, "tokens")
-        schedule.every(exchanges_interval).hours.do(self.task_wrapper, "exchanges") 
-        schedule.every(details_interval).hours.do(self.task_wrapper, "details")
-
-    def _start_thread(self):
-        self.thread = threading.Thread(target=self.run, daemon=True)
+    def _start_loop(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run_loop, args=(self.loop,), daemon=True)
         self.thread.start()
 
-    def run(self):
-        while not self.stop_flag:
-            try:
-                schedule.run_pending()
-                time.sleep(1)
-            except Exception as e:
-                self._log_error(f"Ошибка в планировщике: {str(e)}")
+    def _run_loop(self, loop: asyncio.AbstractEventLoop):
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _run_lanes(self, intervals: Dict[str, float]):
+        # Every job type has its own lane: a timer plus a dedicated worker
+        # thread, so a long details run never delays the token tick.
+        lanes = [asyncio.create_task(self._lane(task_type, interval)) for task_type, interval in intervals.items()]
+        await asyncio.gather(*lanes, return_exceptions=True)
+
+    async def _lane(self, task_type: str, interval: float):
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"scheduler-{task_type}")
+        next_run = loop.time() + interval
+
+        try:
+            while True:
+                await asyncio.sleep(max(0.0, next_run - loop.time()))
+                await loop.run_in_executor(executor, self.task_wrapper, task_type)
+
+                # Runs stay on the fixed grid started at launch; a run that
+                # overran its interval skips the missed slots instead of
+                # firing them back to back.
+                next_run += interval
+                now = loop.time()
+                if next_run <= now:
+                    missed = int((now - next_run) // interval) + 1
+                    next_run += missed * interval
+                    self._log_error(f"Задача {task_type} пропустила {missed} запуск(ов) из-за долгого выполнения")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
     def stop(self):
-        self.stop_flag = True
-        schedule.clear()
+        with self._state_lock:
+            self._stopping.set()
+            loop, self.loop = self.loop, None
+
+        # The shutdown is queued on the loop whether or not its thread has
+        # started running it yet.
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop)
+        with self._job_loops_lock:
+            job_loops = list(self._job_loops.values())
+        for job_loop in job_loops:
+            try:
+                job_loop.call_soon_threadsafe(self._cancel_all_tasks, job_loop)
+            except RuntimeError:
+                # The job finished and closed its loop in the meantime.
+                pass
+
         timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
         self.log_list.append(f"[{timestamp}] Планировщик остановлен")
 
+    async def _shutdown(self):
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        asyncio.get_running_loop().stop()
+
+    def _cancel_all_tasks(self, job_loop: asyncio.AbstractEventLoop):
+        for task in asyncio.all_tasks(job_loop):
+            task.cancel()
+
     def task_wrapper(self, task_type: str):
+        if self._stopping.is_set():
+            return
         try:
             task_map = {
                 "tokens": self._run_tokens_task,
                 "exchanges": self._run_exchanges_task,
                 "details": self._run_details_task
             }
-            
+
             task_func = task_map.get(task_type)
             if task_func:
                 task_func()
@@ -90,9 +158,24 @@ class TaskScheduler:
         task_every_1_hour(self.log_list)
 
     def _run_details_task(self):
-        from scheduler.tasks import task_every_24_hours
-        task_every_24_hours(self.log_list)
+        from scheduler.tasks import task_every_24_hours_async
+        self._run_cancellable("details", task_every_24_hours_async(self.log_list))
+
+    def _run_cancellable(self, task_type: str, coroutine):
+        # Long async jobs run on a loop owned by their lane thread; stop()
+        # cancels them through that loop, down to in-flight HTTP requests.
+        job_loop = asyncio.new_event_loop()
+        with self._job_loops_lock:
+            self._job_loops[task_type] = job_loop
+        try:
+            job_loop.run_until_complete(coroutine)
+        except asyncio.CancelledError:
+            self._log_error(f"Задача {task_type} отменена")
+        finally:
+            with self._job_loops_lock:
+                self._job_loops.pop(task_type, None)
+            job_loop.close()
 
     def _log_error(self, message: str):
         timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-        self.log_list.append(f"[{timestamp}] {message}")
\ No newline at end of file
+        self.log_list.append(f"[{timestamp}] {message}")
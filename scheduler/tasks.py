@@ -36,13 +36,13 @@ def task_every_1_hour(log_list: List[str]):
         log_task(f"Ошибка обновления ExchangesStats: {str(e)}", log_list)
 
 
-def task_every_24_hours(log_list: List[str]):
+async def task_every_24_hours_async(log_list: List[str]):
     log_task("Выполнена задача: Сбор детальной информации Tokens и Exchanges (24 часа)", log_list)
     
     try:
         aggregator = CoingeckoAggregator(is_demo=False)
-        aggregator.collect_tokens_detailed_info_daily(limit=500)
-        aggregator.collect_exchanges_detailed_info_daily(limit=100)
+        await aggregator.collect_tokens_detailed_info_daily_async(limit=500)
+        await aggregator.collect_exchanges_detailed_info_daily_async(limit=100)
         log_task("Детальная информация успешно собрана", log_list)
     except Exception as e:
         log_task(f"Ошибка сбора детальной информации: {str(e)}", log_list)
@@ -87,6 +87,17 @@ def manual_task_exchange_details(log_list: List[str]):
         log_task(f"Ошибка сбора детальной информации о биржах: {str(e)}", log_list)
 
 
+def manual_task_history_backfill(log_list: List[str]):
+    log_task("Ручной запуск загрузки истории токенов", log_list)
+    
+    try:
+        aggregator = CoingeckoAggregator(is_demo=False)
+        aggregator.backfill_token_history(limit=500)
+        log_task("История токенов успешно загружена", log_list)
+    except Exception as e:
+        log_task(f"Ошибка загрузки истории токенов: {str(e)}", log_list)
+
+
 def manual_task_token_stats(log_list: List[str]):
     log_task("Ручной запуск обновления статистики токенов", log_list)
     
@@ -0,0 +1,56 @@
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Set, Tuple
+
+from configs.config import settings
+
+
+DAY = 24 * 3600
+
+
+def backfill_windows(now: int, days: int, window_days: int) -> List[Tuple[int, int]]:
+    # Window ends sit on a fixed grid from the epoch, so every run cuts the
+    # same windows and a finished one is recognised by its end no matter when
+    # the job starts. Only the first window is clamped to the horizon, so
+    # nothing older than `days` is fetched.
+    size = window_days * DAY
+    horizon = now - days * DAY
+    first_end = (horizon // size + 1) * size
+    ends = range(first_end, now + size, size)
+    return [(max(end - size, horizon), end) for end in ends]
+
+
+class BackfillCheckpoints:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.get('BACKFILL.CHECKPOINT_PATH', '.backfill_checkpoints.json')
+
+        self._done: Dict[str, Set[int]] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def is_done(self, coingecko_id: str, window_end: int) -> bool:
+        with self._lock:
+            return window_end in self._done.get(coingecko_id, ())
+
+    def mark_done(self, coingecko_id: str, window_end: int) -> None:
+        with self._lock:
+            self._done.setdefault(coingecko_id, set()).add(window_end)
+            self._save()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._done = {coingecko_id: set(ends) for coingecko_id, ends in data.items()}
+
+    def _save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({coingecko_id: sorted(ends) for coingecko_id, ends in self._done.items()}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not save backfill checkpoints: {e}")
@@ -3,19 +3,29 @@ import time
 import asyncio
 import aiohttp
 from decimal import Decimal
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 
+from aws.repositories.async_repository import AsyncRepository, run_blocking
 from aws.repositories.exchange_repository import ExchangeRepository
 from aws.repositories.platform_repository import PlatformRepository
 from aws.repositories.token_repository import TokensRepository
 from aws.repositories.token_stats_repository import TokenStatsRepository
+from aws.repositories.token_stats_history_repository import TokenStatsHistoryRepository
 from aws.repositories.exchanges_stats_repository import ExchangesStatsRepository
+from aws.repositories.generic_repository import FAILED, UNCHANGED, WRITTEN
 from configs.config import settings
+from services.backfill_checkpoints import DAY, BackfillCheckpoints, backfill_windows
+from services.exchange_id_map import get_exchange_id_map
+from services.http_transport import HttpTransport
+from services.market_transform import transform_markets
+from services.metrics_engine import get_metrics_engine, to_float, to_timestamp
+from services.rate_limiter import ApiRateLimiter, get_api_limiter, retry_after_seconds
+from services.response_cache import CachedResponse, ResponseCache, get_response_cache
+from services.worker_pool import WorkerPool
 from models.exchanges import Exchange
 from models.platform import Platform
 from models.tokens import Token
-from models.token_stats import TokenStats
 from models.exchanges_stats import ExchangesStats
 
 
@@ -24,8 +34,13 @@ class CoingeckoAggregator:
     PRO_BASE_URL = "https://pro-api.coingecko.com/api/v3"
     
     REQUEST_TIMEOUT = 10
-    BATCH_SIZE = 50
-    EXCHANGE_BATCH_SIZE = 20
+    MAX_RETRIES = 5
+    DEFAULT_RETRY_AFTER = 60
+    MAX_PER_PAGE = 250
+    DETAIL_CONCURRENCY = 20
+    DETAILS_CACHE_TTL = 7 * 24 * 3600
+    DETAILS_MAX_AGE_HOURS = 7 * 24
+    PLATFORM_FLUSH_SIZE = 100
 
     def __init__(self, 
                  api_key: str = settings.Coingecko.API_KEY, 
@@ -39,6 +54,29 @@ class CoingeckoAggregator:
             "X-Cg-Pro-Api-Key": self.api_key
         }
         
+        self.pending_platforms: Dict[str, Platform] = {}
+        self.platforms_saved = 0
+        self.platform_flush_size = settings.get('Coingecko.PLATFORM_FLUSH_SIZE', self.PLATFORM_FLUSH_SIZE)
+        self.http = HttpTransport()
+        self.plan = 'demo' if is_demo else settings.get('Coingecko.PLAN', 'analyst')
+        self.rate_limiter = get_api_limiter(self.api_key, self.plan)
+        self.max_retries = settings.get('Coingecko.MAX_RETRIES', self.MAX_RETRIES)
+        self.details_incremental = settings.get('Coingecko.DETAILS_INCREMENTAL', True)
+        self.details_max_age = timedelta(hours=settings.get('Coingecko.DETAILS_MAX_AGE_HOURS', self.DETAILS_MAX_AGE_HOURS))
+        # No per-item timeout: an item may legitimately wait out the shared
+        # rate limit and a Retry-After, and every HTTP attempt is already
+        # bounded by REQUEST_TIMEOUT.
+        self.detail_workers = WorkerPool(
+            concurrency=settings.get('Coingecko.DETAIL_CONCURRENCY', self.DETAIL_CONCURRENCY)
+        )
+        self.page_concurrency = settings.get('Coingecko.PAGE_CONCURRENCY', 5)
+        self.response_cache = get_response_cache()
+        self.exchange_ids = get_exchange_id_map()
+        self.metrics = get_metrics_engine()
+        self.min_window_coverage = settings.get('METRICS.MIN_COVERAGE', 0.9)
+        self.coin_details_ttl = settings.get('HTTP_CACHE.COIN_DETAILS_TTL', self.DETAILS_CACHE_TTL)
+        self.exchange_details_ttl = settings.get('HTTP_CACHE.EXCHANGE_DETAILS_TTL', self.DETAILS_CACHE_TTL)
+
         self._init_repositories()
 
     def _init_repositories(self):
@@ -47,65 +85,147 @@ class CoingeckoAggregator:
         self.exchange_repo = ExchangeRepository()
         self.token_stats_repo = TokenStatsRepository()
         self.exchanges_stats_repo = ExchangesStatsRepository()
+        self.token_stats_history_repo = TokenStatsHistoryRepository()
+
+        self.token_repo_async = AsyncRepository(self.token_repo)
+        self.exchange_repo_async = AsyncRepository(self.exchange_repo)
 
-    def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> Any:
+    def _make_request(self, endpoint: str, params: Optional[Dict] = None,
+                      cache_ttl: Optional[float] = None) -> Any:
         url = f"{self.base_url}/{endpoint}"
+        cache_key, cached = self._cache_lookup(endpoint, params, cache_ttl)
+        if cached and cached.is_fresh(cache_ttl):
+            return cached.data
+
         try:
-            response = requests.get(
-                url, 
-                headers=self.headers, 
-                params=params, 
-                timeout=self.REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-            return response.json()
+            for _ in range(self.max_retries + 1):
+                self.rate_limiter.acquire()
+                response = self.http.get(
+                    url, 
+                    headers=self._request_headers(cached), 
+                    params=params, 
+                    timeout=self.REQUEST_TIMEOUT
+                )
+                if response.status_code == 304 and cached:
+                    return self._cache_revalidated(cache_key, cached)
+                if response.status_code != 429:
+                    response.raise_for_status()
+                    data = response.json()
+                    self._cache_store(cache_key, endpoint, data, response.headers.get('ETag'))
+                    return data
+                self._on_throttled(endpoint, response.headers.get('Retry-After'))
+            return None
         except requests.exceptions.RequestException:
             return None
 
     async def _make_async_request(self, session: aiohttp.ClientSession, 
-                                endpoint: str, params: Optional[Dict] = None) -> Any:
+                                endpoint: str, params: Optional[Dict] = None,
+                                cache_ttl: Optional[float] = None) -> Any:
         url = f"{self.base_url}/{endpoint}"
+        cache_key, cached = await run_blocking(self._cache_lookup, endpoint, params, cache_ttl)
+        if cached and cached.is_fresh(cache_ttl):
+            return cached.data
+
         try:
             timeout = aiohttp.ClientTimeout(total=self.REQUEST_TIMEOUT)
-            async with session.get(url, headers=self.headers, params=params, timeout=timeout) as response:
-                if response.status == 200:
-                    return await response.json()
-                return None
-        except:
+            headers = self._request_headers(cached)
+            for _ in range(self.max_retries + 1):
+                await self.rate_limiter.acquire_async()
+                async with session.get(url, headers=headers, params=params, timeout=timeout) as response:
+                    if response.status == 304 and cached:
+                        return await run_blocking(self._cache_revalidated, cache_key, cached)
+                    if response.status == 200:
+                        data = await response.json()
+                        await run_blocking(
+                            self._cache_store, cache_key, endpoint, data, response.headers.get('ETag')
+                        )
+                        return data
+                    if response.status != 429:
+                        return None
+                    self._on_throttled(endpoint, response.headers.get('Retry-After'))
+            return None
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
             return None
 
-    def get_coins_markets(self, limit: int = 500) -> List[Dict]:
-        all_coins = []
-        per_page = min(250, limit)
-        pages_needed = (limit + per_page - 1) // per_page
-        
-        for page in range(1, pages_needed + 1):
-            params = {
-                'vs_currency': 'usd',
-                'order': 'market_cap_desc',
-                'per_page': per_page,
-                'page': page,
-                'sparkline': 'false',
-                'price_change_percentage': '1h,24h,7d,30d'
-            }
-            
-            data = self._make_request("coins/markets", params)
-            if data:
-                all_coins.extend(data)
-            
-            if len(all_coins) >= limit:
-                break
-                
-        return all_coins[:limit]
+    def _cache_lookup(self, endpoint: str, params: Optional[Dict],
+                      cache_ttl: Optional[float]) -> tuple:
+        if cache_ttl is None or self.response_cache is None:
+            return None, None
+
+        cache_key = ResponseCache.key(endpoint, params)
+        cached = self.response_cache.get(cache_key)
+        if cached is None:
+            self.response_cache.record('misses')
+        elif cached.is_fresh(cache_ttl):
+            self.response_cache.record('hits')
+        return cache_key, cached
+
+    def _request_headers(self, cached: Optional[CachedResponse]) -> Dict:
+        if cached and cached.etag:
+            return {**self.headers, "If-None-Match": cached.etag}
+        return self.headers
+
+    def _cache_store(self, cache_key: Optional[str], endpoint: str, data: Any, etag: Optional[str]):
+        if cache_key is not None and data is not None:
+            self.response_cache.put(cache_key, endpoint, data, etag)
+
+    def _cache_revalidated(self, cache_key: str, cached: CachedResponse) -> Any:
+        self.response_cache.touch(cache_key)
+        self.response_cache.record('revalidated')
+        return cached.data
+
+    def _on_throttled(self, endpoint: str, retry_after: Optional[str]):
+        delay = retry_after_seconds(retry_after, self.DEFAULT_RETRY_AFTER)
+        print(f"Rate limited on {endpoint}, retrying in {delay:.1f}s")
+        self.rate_limiter.on_throttle(delay)
 
-    def get_exchanges_list(self, limit: int = 100) -> List[Dict]:
+    def get_coins_markets(self, limit: int = 500) -> List[Dict]:
         params = {
-            'per_page': min(250, limit),
-            'page': 1
+            'vs_currency': 'usd',
+            'order': 'market_cap_desc',
+            'sparkline': 'false',
+            'price_change_percentage': '1h,24h,7d,30d'
         }
-        
-        data = self._make_request("exchanges", params)
-        return data[:limit] if data else []
+        return self._fetch_pages("coins/markets", params, limit)
+
+    def get_exchanges_list(self, limit: int = 100) -> List[Dict]:
+        return self._fetch_pages("exchanges", {}, limit)
+
+    def _fetch_pages(self, endpoint: str, params: Dict, limit: int) -> List[Dict]:
+        # Pages go out in parallel over the pooled session on the transport's
+        # long-lived workers, so every tick reuses the same connections.
+        per_page = min(self.MAX_PER_PAGE, limit)
+        pages_needed = (limit + per_page - 1) // per_page
+        last_page = pages_needed
+        pages: Dict[int, List[Dict]] = {}
+
+        for first in range(1, pages_needed + 1, self.page_concurrency):
+            # A short or failed page ends the listing; pages past it are
+            # not requested at all.
+            if first > last_page:
+                break
+            batch = range(first, min(first + self.page_concurrency, last_page + 1))
+            futures = {
+                page: self.http.executor.submit(
+                    self._make_request, endpoint, {**params, 'per_page': per_page, 'page': page}
+                )
+                for page in batch
+            }
+            for page, future in futures.items():
+                data = future.result()
+                if data is None:
+                    print(f"Page {page} of {endpoint} failed, listing ends at page {page - 1}")
+                    last_page = min(last_page, page - 1)
+                    break
+                pages[page] = data
+                if len(data) < per_page:
+                    last_page = min(last_page, page)
+                    break
+
+        results = []
+        for page in range(1, last_page + 1):
+            results.extend(pages[page])
+        return results[:limit]
 
     def get_coin_details(self, coin_id: str) -> Optional[Dict]:
         params = {
@@ -116,7 +236,7 @@ class CoingeckoAggregator:
             'developer_data': 'false',
             'sparkline': 'false'
         }
-        return self._make_request(f"coins/{coin_id}", params)
+        return self._make_request(f"coins/{coin_id}", params, cache_ttl=self.coin_details_ttl)
 
     async def get_coin_details_async(self, session: aiohttp.ClientSession, coin_id: str) -> Optional[Dict]:
         params = {
@@ -127,13 +247,14 @@ class CoingeckoAggregator:
             'developer_data': 'false',
             'sparkline': 'false'
         }
-        return await self._make_async_request(session, f"coins/{coin_id}", params)
+        return await self._make_async_request(session, f"coins/{coin_id}", params, cache_ttl=self.coin_details_ttl)
 
     def get_exchange_details(self, exchange_id: str) -> Optional[Dict]:
-        return self._make_request(f"exchanges/{exchange_id}")
+        return self._make_request(f"exchanges/{exchange_id}", cache_ttl=self.exchange_details_ttl)
 
     async def get_exchange_details_async(self, session: aiohttp.ClientSession, exchange_id: str) -> Optional[Dict]:
-        return await self._make_async_request(session, f"exchanges/{exchange_id}")
+        return await self._make_async_request(session, f"exchanges/{exchange_id}",
+                                              cache_ttl=self.exchange_details_ttl)
 
     def update_tokens_stats_every_10_seconds(self, limit: int = 500) -> None:
         print(f"Updating TokenStats from markets data (limit: {limit})...")
@@ -146,35 +267,62 @@ class CoingeckoAggregator:
 
         print(f"Received {len(market_coins)} tokens in {time.time() - start_time:.2f}s")
 
-        stats_batch = self._process_market_coins(market_coins)
-        updated_count, failed_count = self._save_token_stats_batch(stats_batch)
+        stats_records = transform_markets(market_coins)
+        self._apply_token_metrics(stats_records, start_time)
+        updated_count, skipped_count, failed_count = self._save_token_stats_batch(stats_records)
+        history_count = self._save_token_stats_history(stats_records, int(start_time))
 
         total_time = time.time() - start_time
-        print(f"Completed: {updated_count} saved, {failed_count} failed in {total_time:.2f}s")
+        print(f"Completed: {updated_count} saved, {skipped_count} unchanged, {failed_count} failed, "
+              f"{history_count} history points in {total_time:.2f}s")
+        self._log_transport_stats()
+
+    def _apply_token_metrics(self, stats_records: List[Dict], timestamp: float):
+        for record in stats_records:
+            series = self.metrics.observe(
+                f"token:{record['coingecko_id']}", timestamp,
+                price=to_float(record['price']),
+                volume=to_float(record['trading_volume_24h']),
+                source_updated_at=to_timestamp(record['source_updated_at'])
+            )
+            record['volume_1m_change_1m'] = self._round_str(self._covered(series['1m'], series['1m'].volume_change()), 4)
+            record['vwap_24h'] = self._round_str(series['24h'].vwap(), 8)
+            record['volatility_24h'] = self._round_str(series['24h'].volatility(), 6)
+        self.metrics.save_if_due()
 
-    def _process_market_coins(self, market_coins: List[Dict]) -> List[TokenStats]:
-        stats_batch = []
-        for market_coin in market_coins:
-            try:
-                stats = self._create_token_stats_from_market(market_coin)
-                if stats:
-                    stats_batch.append(stats)
-            except Exception:
-                continue
-        return stats_batch
+    def _save_token_stats_batch(self, stats_records: List[Dict]) -> tuple:
+        try:
+            outcomes = self.token_stats_repo.upsert_items(stats_records)
+        except Exception as e:
+            print(f"Error saving TokenStats batch: {e}")
+            return 0, 0, len(stats_records)
+
+        return self._count_outcomes(outcomes)
+
+    def _save_token_stats_history(self, stats_records: List[Dict], timestamp: int) -> int:
+        points = [
+            {
+                'coingecko_id': record['coingecko_id'],
+                'timestamp': timestamp,
+                'symbol': record['symbol'],
+                'price': record['price'],
+                'market_cap': record['market_cap'],
+                'trading_volume_24h': record['trading_volume_24h'],
+                'volume_24h_change_24h': record['volume_24h_change_24h'],
+            }
+            for record in stats_records
+        ]
+        try:
+            outcomes = self.token_stats_history_repo.append_records(points)
+        except Exception as e:
+            print(f"Error saving TokenStats history: {e}")
+            return 0
+        return len(outcomes) - outcomes.count(FAILED)
 
-    def _save_token_stats_batch(self, stats_batch: List[TokenStats]) -> tuple:
-        updated_count = 0
-        failed_count = 0
-        
-        for stats in stats_batch:
-            try:
-                self.token_stats_repo.create_or_update(stats)
-                updated_count += 1
-            except Exception:
-                failed_count += 1
-                
-        return updated_count, failed_count
+    def _count_outcomes(self, outcomes: List[str]) -> tuple:
+        skipped_count = outcomes.count(UNCHANGED)
+        failed_count = outcomes.count(FAILED)
+        return len(outcomes) - skipped_count - failed_count, skipped_count, failed_count
 
     def update_exchanges_stats_every_10_seconds(self, limit: int = 100) -> None:
         print(f"Updating ExchangesStats from list data (limit: {limit})...")
@@ -186,24 +334,35 @@ class CoingeckoAggregator:
             return
         
         print(f"Received {len(exchanges_list)} exchanges in {time.time() - start_time:.2f}s")
+        self.exchange_ids.update(exchanges_list)
         
-        updated_count, failed_count = self._process_exchanges_list(exchanges_list)
+        updated_count, skipped_count, failed_count = self._process_exchanges_list(exchanges_list)
         
         total_time = time.time() - start_time
-        print(f"Completed: {updated_count} updated, {failed_count} failed in {total_time:.2f}s")
+        print(f"Completed: {updated_count} updated, {skipped_count} unchanged, {failed_count} failed in {total_time:.2f}s")
+        self._log_transport_stats()
 
     def _process_exchanges_list(self, exchanges_list: List[Dict]) -> tuple:
-        updated_count = 0
-        failed_count = 0
-        
+        stats_batch = []
+        invalid_count = 0
+        timestamp = time.time()
+
         for exchange_data in exchanges_list:
-            try:
-                self._save_exchange_stats_from_list(exchange_data)
-                updated_count += 1
-            except Exception:
-                failed_count += 1
-                
-        return updated_count, failed_count
+            stats = self._create_exchange_stats_from_list(exchange_data, timestamp)
+            if stats:
+                stats_batch.append(stats)
+            else:
+                invalid_count += 1
+        self.metrics.save_if_due()
+
+        try:
+            outcomes = self.exchanges_stats_repo.upsert_many(stats_batch)
+        except Exception as e:
+            print(f"Error saving ExchangesStats batch: {e}")
+            return 0, 0, len(exchanges_list)
+
+        updated_count, skipped_count, failed_count = self._count_outcomes(outcomes)
+        return updated_count, skipped_count, failed_count + invalid_count
 
     async def collect_tokens_detailed_info_daily_async(self, limit: int = 500) -> None:
         print(f"Collecting detailed info for tokens (daily task, limit: {limit})...")
@@ -214,52 +373,44 @@ class CoingeckoAggregator:
             print("No tokens found in TokenStats")
             return
         
-        print(f"Found {len(coingecko_ids)} unique tokens to process")
+        print(f"Found {len(coingecko_ids)} unique tokens")
+        coingecko_ids = self._select_stale(self.token_repo, 'coingecko_id', coingecko_ids)
+        print(f"{len(coingecko_ids)} tokens are new or stale and will be processed")
         
-        saved_count, failed_count = await self._process_tokens_detailed_async(coingecko_ids, start_time)
+        self.platforms_saved = 0
+        try:
+            saved_count, unchanged_count, failed_count = await self._process_tokens_detailed_async(coingecko_ids, start_time)
+        finally:
+            # Tokens are already stamped as fetched, so their platforms are
+            # written even when the run fails or is cancelled.
+            await self._flush_platforms()
+            if self.pending_platforms:
+                print(f"{len(self.pending_platforms)} platforms could not be saved")
 
         total_time = time.time() - start_time
-        print(f"Completed in {total_time:.2f}s: {saved_count} saved, {failed_count} failed")
+        print(f"Completed in {total_time:.2f}s: {saved_count} saved, {unchanged_count} unchanged, "
+              f"{failed_count} failed, {self.platforms_saved} new platforms")
+        self._log_transport_stats()
 
     def _get_token_coingecko_ids(self, limit: int) -> List[str]:
-        all_token_stats = self.token_stats_repo.get_all()
-        coingecko_ids = list(set([
-            ts.get('coingecko_id') for ts in all_token_stats 
-            if ts.get('coingecko_id')
-        ]))
-        return coingecko_ids[:limit]
+        return self._collect_unique_values(self.token_stats_repo, 'coingecko_id', limit)
 
     async def _process_tokens_detailed_async(self, coingecko_ids: List[str], start_time: float) -> tuple:
-        saved_count = 0
-        failed_count = 0
         total_to_process = len(coingecko_ids)
-        
-        async with aiohttp.ClientSession() as session:
-            for i in range(0, len(coingecko_ids), self.BATCH_SIZE):
-                batch = coingecko_ids[i:i + self.BATCH_SIZE]
-                tasks = [self._save_token_detailed_info_async(session, coin_id) for coin_id in batch]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                batch_saved, batch_failed = self._count_results(results)
-                saved_count += batch_saved
-                failed_count += batch_failed
-                
-                self._log_progress(i + self.BATCH_SIZE, len(coingecko_ids), total_to_process, start_time)
-                await asyncio.sleep(0.5)
-
-        return saved_count, failed_count
+
+        async with self.http.async_session() as session:
+            results = await self.detail_workers.run(
+                coingecko_ids,
+                lambda coin_id: self._save_token_detailed_info_async(session, coin_id),
+                on_progress=lambda done, total: self._log_progress(done, total, total_to_process, start_time)
+            )
+
+        return self._count_results(results)
 
     def _count_results(self, results: List) -> tuple:
-        saved_count = 0
-        failed_count = 0
-        
-        for result in results:
-            if result and not isinstance(result, Exception):
-                saved_count += 1
-            else:
-                failed_count += 1
-                
-        return saved_count, failed_count
+        saved_count = results.count(WRITTEN)
+        unchanged_count = results.count(UNCHANGED)
+        return saved_count, unchanged_count, len(results) - saved_count - unchanged_count
 
     def _log_progress(self, processed: int, total_ids: int, total_to_process: int, start_time: float):
         if processed % 100 == 0 or processed >= total_ids:
@@ -277,143 +428,233 @@ class CoingeckoAggregator:
             print("No exchanges found in ExchangeStats")
             return
         
-        print(f"Found {len(exchange_names)} exchanges to process")
+        print(f"Found {len(exchange_names)} exchanges")
+        exchange_names = self._select_stale(self.exchange_repo, 'name', exchange_names)
+        print(f"{len(exchange_names)} exchanges are new or stale and will be processed")
         
-        saved_count, failed_count = await self._process_exchanges_detailed_async(exchange_names)
+        saved_count, unchanged_count, failed_count = await self._process_exchanges_detailed_async(exchange_names)
 
         total_time = time.time() - start_time
-        print(f"Successfully saved detailed info for {saved_count} exchanges in {total_time:.2f}s, {failed_count} failed")
+        print(f"Successfully saved detailed info for {saved_count} exchanges in {total_time:.2f}s, "
+              f"{unchanged_count} unchanged, {failed_count} failed")
+        self._log_transport_stats()
 
     def _get_exchange_names(self, limit: int) -> List[str]:
-        all_exchange_stats = self.exchanges_stats_repo.get_all()
-        exchange_names = list(set([
-            es.get('name') for es in all_exchange_stats 
-            if es.get('name')
-        ]))
-        return exchange_names[:limit]
+        return self._collect_unique_values(self.exchanges_stats_repo, 'name', limit)
+
+    def _select_stale(self, repo, attr_name: str, candidates: List[str]) -> List[str]:
+        if not self.details_incremental:
+            return candidates
+
+        segments = settings.get('DYNAMO.SCAN_SEGMENTS', 4)
+        fetched_at = {}
+        for item in repo.iter_all(projection=[attr_name, 'details_fetched_at'], segments=segments):
+            if item.get(attr_name):
+                fetched_at[item[attr_name]] = item.get('details_fetched_at') or ''
+
+        # Never-seen entities come first, then known ones from the oldest
+        # fetch; rows saved before fetch tracking sort as the oldest.
+        cutoff = str(datetime.now() - self.details_max_age)
+        new = [value for value in candidates if value not in fetched_at]
+        stale = sorted(
+            (value for value in candidates if value in fetched_at and fetched_at[value] < cutoff),
+            key=fetched_at.get
+        )
+        return new + stale
+
+    def _collect_unique_values(self, repo, attr_name: str, limit: int) -> List[str]:
+        values = {}
+        segments = settings.get('DYNAMO.SCAN_SEGMENTS', 4)
+        for item in repo.iter_all(projection=[attr_name], segments=segments):
+            value = item.get(attr_name)
+            if value:
+                values[value] = None
+                if len(values) >= limit:
+                    break
+        return list(values)
 
     async def _process_exchanges_detailed_async(self, exchange_names: List[str]) -> tuple:
-        saved_count = 0
-        failed_count = 0
-        
-        async with aiohttp.ClientSession() as session:
-            for i in range(0, len(exchange_names), self.EXCHANGE_BATCH_SIZE):
-                batch = exchange_names[i:i + self.EXCHANGE_BATCH_SIZE]
-                tasks = []
-                
-                for exchange_name in batch:
-                    exchange_id = self._name_to_id(exchange_name)
-                    tasks.append(self._save_exchange_detailed_info_async(session, exchange_id))
-                
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                batch_saved, batch_failed = self._count_results(results)
-                saved_count += batch_saved
-                failed_count += batch_failed
-                
-                processed = min(i + self.EXCHANGE_BATCH_SIZE, len(exchange_names))
-                print(f"Processed {processed}/{len(exchange_names)} exchanges")
-                
-                await asyncio.sleep(0.5)
-                
-        return saved_count, failed_count
+        start_time = time.time()
+        await run_blocking(self._refresh_exchange_ids)
+        exchange_ids = []
+        for exchange_name in exchange_names:
+            exchange_id = self.exchange_ids.coingecko_id(exchange_name)
+            if exchange_id:
+                exchange_ids.append(exchange_id)
+        if len(exchange_ids) < len(exchange_names):
+            print(f"Skipping {len(exchange_names) - len(exchange_ids)} exchanges with no known CoinGecko id")
+
+        known = await run_blocking(self.exchange_repo.find_many_by_name, exchange_names)
+        async with self.http.async_session() as session:
+            results = await self.detail_workers.run(
+                exchange_ids,
+                lambda exchange_id: self._save_exchange_detailed_info_async(session, exchange_id, known),
+                on_progress=lambda done, total: self._log_progress(done, total, total, start_time)
+            )
 
-    def collect_tokens_detailed_info_daily(self, limit: int = 500) -> None:
-        asyncio.run(self.collect_tokens_detailed_info_daily_async(limit))
+        return self._count_results(results)
 
-    def collect_exchanges_detailed_info_daily(self, limit: int = 100) -> None:
-        asyncio.run(self.collect_exchanges_detailed_info_daily_async(limit))
+    async def backfill_token_history_async(self, days: Optional[int] = None, limit: int = 500) -> None:
+        days = days or settings.get('BACKFILL.DAYS', 365)
+        print(f"Backfilling token history (days: {days}, limit: {limit})...")
+        start_time = time.time()
 
-    def _create_token_stats_from_market(self, market_coin: Dict) -> Optional[TokenStats]:
-        try:
-            symbol = market_coin.get('symbol', '').upper()
-            coingecko_id = market_coin.get('id')
+        coins = self._get_tracked_coins(limit)
+        if not coins:
+            print("No tokens found in TokenStats")
+            return
 
-            if not symbol or not coingecko_id:
-                return None
+        now = int(start_time)
+        windows = backfill_windows(now, days, settings.get('BACKFILL.WINDOW_DAYS', 90))
+        checkpoints = BackfillCheckpoints()
+        # The backfill gets its own slice of the plan on top of the shared
+        # limiter, so the live ticks always keep the rest of the quota.
+        limiter = ApiRateLimiter(
+            calls_per_minute=self.rate_limiter.calls_per_minute * settings.get('BACKFILL.RATE_SHARE', 0.5)
+        )
+        # Writes get their own budget too and yield to the live appends.
+        history_repo = TokenStatsHistoryRepository(
+            write_budget='backfill', write_share=settings.get('BACKFILL.WRITE_SHARE', 0.5)
+        )
+        workers = WorkerPool(concurrency=settings.get('BACKFILL.CONCURRENCY', 4))
+        # Every loaded point is at most `days` old, so this keeps each one for
+        # at least a day past the load instead of writing rows TTL has
+        # already claimed.
+        retention_seconds = (max(days, settings.get('HISTORY.RETENTION_DAYS', 30)) + 1) * DAY
+        print(f"Found {len(coins)} tokens, {len(windows)} windows each")
+
+        async with self.http.async_session() as session:
+            results = await workers.run(
+                coins.items(),
+                lambda coin: self._backfill_coin_async(
+                    session, coin, windows, now, checkpoints, limiter, history_repo, retention_seconds
+                ),
+                on_progress=lambda done, total: self._log_progress(done, total, total, start_time)
+            )
 
-            market_cap_usd = market_coin.get('market_cap')
-            volume_24h_usd = market_coin.get('total_volume')
-            liquidity_score = self._calculate_liquidity_score(market_cap_usd, volume_24h_usd)
-            tvl = self._calculate_tvl_from_market(market_coin)
-
-            return TokenStats(
-                symbol=symbol,
-                coingecko_id=coingecko_id,
-                coin_name=market_coin.get('name', ''),
-                price=self._safe_str(market_coin.get('current_price')),
-                market_cap=self._safe_str(market_cap_usd),
-                trading_volume_24h=self._safe_str(volume_24h_usd),
-                token_max_supply=self._safe_str(market_coin.get('max_supply')),
-                token_total_supply=self._safe_str(market_coin.get('total_supply')),
-                transactions_count_30d=self._safe_str(market_coin.get('market_cap_rank')),
-                volume_1m_change_1m=self._safe_str(market_coin.get('price_change_percentage_30d_in_currency')),
-                volume_24h_change_24h=self._safe_str(market_coin.get('price_change_percentage_24h')),
-                ath=self._safe_str(market_coin.get('ath')),
-                atl=self._safe_str(market_coin.get('atl')),
-                liquidity_score=liquidity_score,
-                tvl=tvl
+        loaded = sum(result for result in results if isinstance(result, int))
+        failed_count = sum(1 for result in results if isinstance(result, Exception))
+        total_time = time.time() - start_time
+        print(f"Backfill completed in {total_time:.2f}s: {loaded} points loaded, "
+              f"{failed_count} tokens incomplete (resumed on the next run)")
+        self._log_transport_stats()
+
+    def _get_tracked_coins(self, limit: int) -> Dict[str, str]:
+        coins = {}
+        segments = settings.get('DYNAMO.SCAN_SEGMENTS', 4)
+        for item in self.token_stats_repo.iter_all(projection=['coingecko_id', 'symbol'], segments=segments):
+            if item.get('coingecko_id') and item.get('symbol'):
+                coins[item['coingecko_id']] = item['symbol']
+                if len(coins) >= limit:
+                    break
+        return coins
+
+    async def _backfill_coin_async(self, session: aiohttp.ClientSession, coin: tuple, windows: List[tuple],
+                                   now: int, checkpoints: BackfillCheckpoints, limiter: ApiRateLimiter,
+                                   history_repo: TokenStatsHistoryRepository, retention_seconds: int) -> int:
+        coingecko_id, symbol = coin
+        loaded = 0
+        for window_start, window_end in windows:
+            if checkpoints.is_done(coingecko_id, window_end):
+                continue
+
+            await limiter.acquire_async()
+            chart = await self._make_async_request(
+                session, f"coins/{coingecko_id}/market_chart/range",
+                {'vs_currency': 'usd', 'from': window_start, 'to': min(window_end, now)}
             )
-        except Exception:
-            return None
+            if chart is None:
+                raise RuntimeError(f"No market chart for {coingecko_id} from {window_start}")
+
+            points = [
+                point for point in self._chart_points(coingecko_id, symbol, chart)
+                if point['timestamp'] >= window_start
+            ]
+            outcomes = await run_blocking(history_repo.append_records, points, retention_seconds)
+            if FAILED in outcomes:
+                raise RuntimeError(f"Could not store history for {coingecko_id} from {window_start}")
+
+            # The window that contains `now` is still filling up, so it is
+            # fetched again on every run. A clamped first window is complete
+            # once loaded: the part before the horizon only grows older.
+            if window_end <= now:
+                await run_blocking(checkpoints.mark_done, coingecko_id, window_end)
+            loaded += len(points)
+        return loaded
+
+    def _chart_points(self, coingecko_id: str, symbol: str, chart: Dict) -> List[Dict]:
+        points: Dict[int, Dict] = {}
+        for series, field in (('prices', 'price'), ('market_caps', 'market_cap'),
+                              ('total_volumes', 'trading_volume_24h')):
+            for timestamp_ms, value in chart.get(series) or []:
+                timestamp = int(timestamp_ms // 1000)
+                point = points.setdefault(timestamp, {
+                    'coingecko_id': coingecko_id,
+                    'timestamp': timestamp,
+                    'symbol': symbol,
+                })
+                point[field] = self._safe_str(value)
+        return list(points.values())
+
+    def backfill_token_history(self, days: Optional[int] = None, limit: int = 500) -> None:
+        asyncio.run(self.backfill_token_history_async(days, limit))
 
-    def _calculate_liquidity_score(self, market_cap_usd: float, volume_24h_usd: float) -> Optional[str]:
-        if market_cap_usd and volume_24h_usd and market_cap_usd > 0:
-            return str(round((volume_24h_usd / market_cap_usd) * 100, 4))
-        return None
+    def collect_tokens_detailed_info_daily(self, limit: int = 500) -> None:
+        asyncio.run(self.collect_tokens_detailed_info_daily_async(limit))
 
-    def _calculate_tvl_from_market(self, market_coin: Dict) -> Optional[str]:
-        try:
-            market_cap = market_coin.get('market_cap')
-            total_volume = market_coin.get('total_volume')
-            
-            if not market_cap or not total_volume:
-                return None
-                
-            velocity = total_volume / market_cap if market_cap > 0 else 0
-            tvl_factor = max(0.1, min(2.0, 1 / (1 + velocity * 10)))
-            estimated_tvl = market_cap * tvl_factor * 0.3
-            return str(round(estimated_tvl, 2))
-        except:
-            return None
+    def collect_exchanges_detailed_info_daily(self, limit: int = 100) -> None:
+        asyncio.run(self.collect_exchanges_detailed_info_daily_async(limit))
 
-    def _save_exchange_stats_from_list(self, exchange_data: Dict) -> None:
+    def _create_exchange_stats_from_list(self, exchange_data: Dict,
+                                         timestamp: Optional[float] = None) -> Optional[ExchangesStats]:
         try:
             exchange_id = exchange_data.get('id')
             if not exchange_id:
-                return
+                return None
             
-            existing_exchange = self.exchange_repo.get_by_name(exchange_data.get('name'))
-            db_exchange_id = existing_exchange['id'] if existing_exchange else exchange_id
+            db_exchange_id = self.exchange_repo.id_for_name(exchange_data.get('name')) or exchange_id
+
+            # The list only reports 24h volumes; longer windows are the mean
+            # observed 24h volume scaled to the window length, once the
+            # observations cover most of the window.
+            timestamp = timestamp or time.time()
+            volume = self.metrics.observe(
+                f"exchange:{exchange_id}", timestamp,
+                volume=to_float(exchange_data.get('trade_volume_24h_btc'))
+            )
+            volume_1w = self._covered(volume['1w'], volume['1w'].mean_volume())
+            volume_1m = self._covered(volume['1m'], volume['1m'].mean_volume())
 
             stats = ExchangesStats(
                 exchange_id=db_exchange_id,
                 name=exchange_data.get('name'),
                 trading_volume_24h=self._safe_str(exchange_data.get('trade_volume_24h_btc')),
-                trading_volume_1w=self._safe_str(exchange_data.get('trade_volume_24h_btc_normalized')),
-                trading_volume_1m=self._safe_str(exchange_data.get('trade_volume_24h_btc_normalized')),
+                trading_volume_1w=self._round_str(volume_1w * 7 if volume_1w is not None else None, 8),
+                trading_volume_1m=self._round_str(volume_1m * 30 if volume_1m is not None else None, 8),
                 visitors_30d=self._safe_str(exchange_data.get('trust_score')),
                 coins_count=exchange_data.get('tickers_count', 0),
                 reserves=self._safe_str(exchange_data.get('year_established'))
             )
-            
-            self.exchanges_stats_repo.create_or_update(stats)
+            return stats
         except Exception:
-            pass
+            return None
 
-    async def _save_token_detailed_info_async(self, session: aiohttp.ClientSession, coingecko_id: str) -> Optional[Dict]:
+    async def _save_token_detailed_info_async(self, session: aiohttp.ClientSession, coingecko_id: str) -> Optional[str]:
         coin_details = await self.get_coin_details_async(session, coingecko_id)
         if not coin_details:
             return None
 
         try:
             token = self._create_token_from_details(coin_details)
-            saved_token = self.token_repo.create_if_not_exists(token)
-            self._save_token_platforms(coin_details, saved_token['id'])
-            return saved_token
+            saved_token, outcome = await self.token_repo_async.upsert_details(token)
+            self._queue_token_platforms(coin_details, saved_token['id'])
         except Exception:
             return None
 
+        if len(self.pending_platforms) >= self.platform_flush_size:
+            await self._flush_platforms()
+        return outcome
+
     def _create_token_from_details(self, coin_details: Dict) -> Token:
         links = coin_details.get('links', {})
         
@@ -433,18 +674,37 @@ class CoingeckoAggregator:
             whitelabel_link=self._get_first_link(links.get('whitepaper', []))
         )
 
-    def _save_token_platforms(self, coin_details: Dict, token_id: str):
+    def _queue_token_platforms(self, coin_details: Dict, token_id: str):
         platforms = coin_details.get('platforms', {})
         for platform_name, address in platforms.items():
-            if address and address.strip():
+            if platform_name and address and address.strip():
                 platform = Platform(
                     token_id=token_id,
                     name=platform_name,
-                    token_address=address
+                    token_address=address.strip()
                 )
-                self.platform_repo.create_if_not_exists(platform)
+                self.pending_platforms[str(platform.id)] = platform
+
+    async def _flush_platforms(self) -> None:
+        platforms = list(self.pending_platforms.values())
+        self.pending_platforms.clear()
+        if not platforms:
+            return
 
-    async def _save_exchange_detailed_info_async(self, session: aiohttp.ClientSession, exchange_id: str) -> Optional[Dict]:
+        try:
+            outcomes = await run_blocking(self.platform_repo.save_many, platforms)
+        except Exception as e:
+            print(f"Error saving platforms: {e}")
+            outcomes = [FAILED] * len(platforms)
+
+        # Failed platforms go back to the queue for the next flush.
+        for platform, outcome in zip(platforms, outcomes):
+            if outcome == FAILED:
+                self.pending_platforms.setdefault(str(platform.id), platform)
+        self.platforms_saved += outcomes.count(WRITTEN)
+
+    async def _save_exchange_detailed_info_async(self, session: aiohttp.ClientSession, exchange_id: str,
+                                                 known: Dict[str, Dict]) -> Optional[str]:
         try:
             exchange_details = await self.get_exchange_details_async(session, exchange_id)
             if not exchange_details:
@@ -462,7 +722,8 @@ class CoingeckoAggregator:
                 native_token_symbol=exchange_details.get('native_coin_id')
             )
             
-            return self.exchange_repo.create_if_not_exists(exchange)
+            _, outcome = await self.exchange_repo_async.upsert_details(exchange, known)
+            return outcome
         except Exception:
             return None
 
@@ -494,8 +755,35 @@ class CoingeckoAggregator:
             return None
         return f"{base_url}{username.strip()}"
 
+    def _log_transport_stats(self) -> None:
+        dynamo = self.token_stats_repo.conn.stats()
+        if dynamo:
+            print(f"DynamoDB: {dynamo['requests']} requests over {dynamo['connections_opened']} connections "
+                  f"from {dynamo['clients']} clients (reuse ratio {dynamo['connection_reuse_ratio']})")
+
+        http = self.http.stats()
+        print(f"HTTP: {http['sync_requests']} sync requests over {http['sync_connections_opened']} connections "
+              f"(reuse ratio {http['sync_connection_reuse_ratio']}), {http['async_requests']} async requests over "
+              f"{http['async_connections_opened']} connections ({http['async_connections_reused']} reused)")
+
+        if self.response_cache is not None:
+            cache = self.response_cache.stats()
+            print(f"Response cache: {cache['hits']} hits, {cache['revalidated']} revalidated, {cache['misses']} misses, "
+                  f"{cache['entries']} entries ({cache['bytes'] / 1024 / 1024:.1f} MB)")
+
+    def _covered(self, window, value: Optional[float]) -> Optional[float]:
+        return value if window.coverage() >= self.min_window_coverage else None
+
     def _safe_str(self, value) -> Optional[str]:
         return str(value) if value is not None else None
 
-    def _name_to_id(self, name: str) -> str:
-        return name.lower().replace(' ', '-').replace('(', '').replace(')', '').replace('.', '')
\ No newline at end of file
+    def _round_str(self, value: Optional[float], digits: int) -> Optional[str]:
+        return str(round(value, digits)) if value is not None else None
+
+    def _refresh_exchange_ids(self) -> None:
+        if not self.exchange_ids.is_stale():
+            return
+        exchanges = self._make_request("exchanges/list")
+        if exchanges:
+            self.exchange_ids.update(exchanges, complete=True)
+            print(f"Refreshed CoinGecko exchange ids ({len(self.exchange_ids)} known)")
\ No newline at end of file
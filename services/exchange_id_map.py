@@ -0,0 +1,87 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+from configs.config import settings
+
+
+def normalize_name(name: str) -> str:
+    return ' '.join(name.lower().split())
+
+
+class ExchangeIdMap:
+    def __init__(self, path: Optional[str] = None, max_age_hours: Optional[float] = None):
+        self.path = path or settings.get('Coingecko.EXCHANGE_MAP_PATH', '.coingecko_exchange_ids.json')
+        self.max_age = (max_age_hours or settings.get('Coingecko.EXCHANGE_MAP_MAX_AGE_HOURS', 24)) * 3600
+        self.refreshed_at = 0.0
+
+        self._names: Dict[str, str] = {}
+        self._ids: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def coingecko_id(self, name: str) -> Optional[str]:
+        with self._lock:
+            return self._ids.get(normalize_name(name))
+
+    def name(self, coingecko_id: str) -> Optional[str]:
+        with self._lock:
+            return self._names.get(coingecko_id)
+
+    def is_stale(self) -> bool:
+        return time.time() - self.refreshed_at >= self.max_age
+
+    def update(self, exchanges: List[Dict], complete: bool = False) -> None:
+        # `complete` marks a full /exchanges/list snapshot; partial listings
+        # such as the /exchanges page only add pairs.
+        with self._lock:
+            changed = False
+            for exchange in exchanges:
+                coingecko_id, name = exchange.get('id'), exchange.get('name')
+                if not coingecko_id or not name:
+                    continue
+                if self._names.get(coingecko_id) != name:
+                    self._names[coingecko_id] = name
+                    changed = True
+                self._ids[normalize_name(name)] = coingecko_id
+            if complete:
+                self.refreshed_at = time.time()
+            if changed or complete:
+                self._save()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._names)
+
+    def _load(self) -> None:
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self.refreshed_at = data.get('refreshed_at', 0.0)
+        self._names = data.get('names', {})
+        self._ids = {normalize_name(name): coingecko_id for coingecko_id, name in self._names.items()}
+
+    def _save(self) -> None:
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'refreshed_at': self.refreshed_at, 'names': self._names}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not persist exchange id map: {e}")
+
+
+_exchange_id_map: Optional[ExchangeIdMap] = None
+_exchange_id_map_lock = threading.Lock()
+
+
+def get_exchange_id_map() -> ExchangeIdMap:
+    global _exchange_id_map
+    with _exchange_id_map_lock:
+        if _exchange_id_map is None:
+            _exchange_id_map = ExchangeIdMap()
+        return _exchange_id_map
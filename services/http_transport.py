@@ -0,0 +1,96 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+
+from configs.config import settings
+
+
+class HttpTransport:
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            self._init_transport()
+            HttpTransport._initialized = True
+
+    def _init_transport(self):
+        self._lock = threading.Lock()
+        self._counters = {
+            'sync_requests': 0,
+            'async_requests': 0,
+            'async_connections_opened': 0,
+            'async_connections_reused': 0,
+        }
+
+        self.adapter = HTTPAdapter(
+            pool_connections=settings.get('HTTP.POOL_CONNECTIONS', 10),
+            pool_maxsize=settings.get('HTTP.POOL_MAXSIZE', 20)
+        )
+        self.session = requests.Session()
+        self.session.mount('https://', self.adapter)
+        self.session.mount('http://', self.adapter)
+        self.executor = ThreadPoolExecutor(
+            max_workers=settings.get('HTTP.FETCH_WORKERS', 8),
+            thread_name_prefix='http-fetch'
+        )
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        self._increment('sync_requests')
+        return self.session.get(url, **kwargs)
+
+    def async_session(self) -> aiohttp.ClientSession:
+        # aiohttp sessions are bound to the event loop that created them, and
+        # each job runs its own loop, so jobs get a session built from the
+        # shared settings that reports into the shared counters.
+        connector = aiohttp.TCPConnector(
+            limit=settings.get('HTTP.ASYNC_LIMIT', 100),
+            limit_per_host=settings.get('HTTP.ASYNC_LIMIT_PER_HOST', 50),
+            keepalive_timeout=settings.get('HTTP.KEEPALIVE_TIMEOUT', 30),
+            ttl_dns_cache=300
+        )
+        return aiohttp.ClientSession(connector=connector, trace_configs=[self._trace_config()])
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+
+        opened = 0
+        served = 0
+        pools = self.adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            opened += getattr(pool, 'num_connections', 0)
+            served += getattr(pool, 'num_requests', 0)
+        stats['sync_connections_opened'] = opened
+        stats['sync_connection_reuse_ratio'] = round(1 - opened / served, 4) if served else 0.0
+        return stats
+
+    def _trace_config(self) -> aiohttp.TraceConfig:
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_request_start(session, context, params):
+            self._increment('async_requests')
+
+        async def on_connection_create_end(session, context, params):
+            self._increment('async_connections_opened')
+
+        async def on_connection_reuseconn(session, context, params):
+            self._increment('async_connections_reused')
+
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    def _increment(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
\ No newline at end of file
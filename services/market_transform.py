@@ -0,0 +1,102 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+from uuid import uuid4
+
+import numpy as np
+
+from models.token_stats import TokenStats
+
+
+# TokenStats fields copied from /coins/markets as-is (stored as strings).
+PASSTHROUGH_FIELDS = {
+    'price': 'current_price',
+    'market_cap': 'market_cap',
+    'trading_volume_24h': 'total_volume',
+    'token_max_supply': 'max_supply',
+    'token_total_supply': 'total_supply',
+    'transactions_count_30d': 'market_cap_rank',
+    'volume_24h_change_24h': 'price_change_percentage_24h',
+    'ath': 'ath',
+    'atl': 'atl',
+}
+
+MIN_TVL_FACTOR = 0.1
+MAX_TVL_FACTOR = 2.0
+TVL_SHARE = 0.3
+
+
+def numeric_column(rows: List[Dict], key: str) -> np.ndarray:
+    # Missing, null and non-numeric values become NaN and drop out of every
+    # mask below.
+    return np.fromiter(
+        (value if isinstance(value, (int, float)) and not isinstance(value, bool) else np.nan
+         for value in (row.get(key) for row in rows)),
+        dtype=np.float64,
+        count=len(rows)
+    )
+
+
+def string_column(rows: List[Dict], key: str) -> List[Optional[str]]:
+    return [None if (value := row.get(key)) is None else str(value) for row in rows]
+
+
+def market_metrics(market_cap: np.ndarray, volume: np.ndarray) -> Dict[str, np.ndarray]:
+    present = np.isfinite(market_cap) & np.isfinite(volume) & (market_cap != 0) & (volume != 0)
+
+    with np.errstate(all='ignore'):
+        velocity = np.where(market_cap > 0, volume / market_cap, 0.0)
+        raw_factor = 1 / (1 + velocity * 10)
+        tvl = market_cap * np.clip(raw_factor, MIN_TVL_FACTOR, MAX_TVL_FACTOR) * TVL_SHARE
+        liquidity_score = np.round(velocity * 100, 4)
+        tvl = np.round(tvl, 2)
+
+    return {
+        'liquidity_score': np.where(present & (market_cap > 0), liquidity_score, np.nan),
+        'tvl': np.where(present & np.isfinite(raw_factor), tvl, np.nan),
+    }
+
+
+def transform_markets(market_coins: List[Dict]) -> List[Dict]:
+    # Turns a /coins/markets response into TokenStats records ready for the
+    # repository: the derived metrics are computed for the whole response at
+    # once, and rows without an id, symbol or name are dropped.
+    valid = [
+        coin for coin in market_coins
+        if isinstance(coin.get('id'), str) and coin['id']
+        and isinstance(coin.get('symbol'), str) and coin['symbol']
+        and isinstance(coin.get('name', ''), str)
+    ]
+    if not valid:
+        return []
+
+    metrics = market_metrics(numeric_column(valid, 'market_cap'), numeric_column(valid, 'total_volume'))
+    liquidity_scores = _to_strings(metrics['liquidity_score'])
+    tvls = _to_strings(metrics['tvl'])
+    columns = {field: string_column(valid, key) for field, key in PASSTHROUGH_FIELDS.items()}
+
+    now = str(datetime.now())
+    records = []
+    for i, coin in enumerate(valid):
+        # Starts from every TokenStats field, so the record keeps the model's
+        # shape; the metric fields are filled in later by the metrics engine.
+        record = dict.fromkeys(TokenStats.model_fields)
+        record.update(
+            id=str(uuid4()),
+            symbol=coin['symbol'].upper(),
+            coin_name=coin.get('name', ''),
+            coingecko_id=coin['id'],
+            liquidity_score=liquidity_scores[i],
+            tvl=tvls[i],
+            source_updated_at=coin.get('last_updated'),
+            created_at=now,
+            updated_at=now,
+            is_deleted=False
+        )
+        for field, values in columns.items():
+            record[field] = values[i]
+        records.append(record)
+    return records
+
+
+def _to_strings(values: np.ndarray) -> List[Optional[str]]:
+    return [None if value != value else str(value) for value in values.tolist()]
@@ -0,0 +1,227 @@
+import json
+import math
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from configs.config import settings
+
+
+DAY = 24 * 3600
+
+# name -> (span, bucket size) in seconds
+WINDOWS = {
+    '24h': (DAY, 3600),
+    '1w': (7 * DAY, 6 * 3600),
+    '1m': (30 * DAY, DAY),
+}
+
+# Bucket layout: one flat list per bucket keeps updates cheap and the
+# snapshot plain JSON.
+START, COUNT, VOLUME_SUM, PV_SUM, PV_WEIGHT, RETURNS, RETURN_SUM, RETURN_SQ_SUM, \
+    FIRST_PRICE, LAST_PRICE, FIRST_VOLUME, LAST_VOLUME, VOLUMES = range(13)
+BUCKET_FIELDS = 13
+TOTAL_FIELDS = (COUNT, VOLUME_SUM, PV_SUM, PV_WEIGHT, RETURNS, RETURN_SUM, RETURN_SQ_SUM, VOLUMES)
+
+
+class RollingWindow:
+    def __init__(self, span: int, bucket_size: int, buckets: Optional[List[list]] = None):
+        self.span = span
+        self.bucket_size = bucket_size
+        # Buckets from an older snapshot layout are dropped, not guessed at.
+        self.buckets = deque(bucket for bucket in buckets or [] if len(bucket) == BUCKET_FIELDS)
+        self.totals = [0.0] * BUCKET_FIELDS
+        for bucket in self.buckets:
+            for field in TOTAL_FIELDS:
+                self.totals[field] += bucket[field]
+
+    def add(self, timestamp: float, price: Optional[float], volume: Optional[float],
+            log_return: Optional[float]) -> None:
+        start = timestamp - timestamp % self.bucket_size
+        if not self.buckets or start > self.buckets[-1][START]:
+            self.buckets.append([start, 0, 0.0, 0.0, 0.0, 0, 0.0, 0.0, price, price, volume, volume, 0])
+        bucket = self.buckets[-1]
+
+        changes = [0.0] * BUCKET_FIELDS
+        changes[COUNT] = 1
+        if volume is not None:
+            changes[VOLUMES] = 1
+            changes[VOLUME_SUM] = volume
+            if price is not None:
+                changes[PV_SUM] = price * volume
+                changes[PV_WEIGHT] = volume
+        if log_return is not None:
+            changes[RETURNS] = 1
+            changes[RETURN_SUM] = log_return
+            changes[RETURN_SQ_SUM] = log_return * log_return
+        for field in TOTAL_FIELDS:
+            bucket[field] += changes[field]
+            self.totals[field] += changes[field]
+
+        if price is not None:
+            if bucket[FIRST_PRICE] is None:
+                bucket[FIRST_PRICE] = price
+            bucket[LAST_PRICE] = price
+        if volume is not None:
+            if bucket[FIRST_VOLUME] is None:
+                bucket[FIRST_VOLUME] = volume
+            bucket[LAST_VOLUME] = volume
+
+        self._expire(timestamp)
+
+    def mean_volume(self) -> Optional[float]:
+        count = self.totals[VOLUMES]
+        return self.totals[VOLUME_SUM] / count if count else None
+
+    def vwap(self) -> Optional[float]:
+        weight = self.totals[PV_WEIGHT]
+        return self.totals[PV_SUM] / weight if weight else None
+
+    def volatility(self) -> Optional[float]:
+        # Standard deviation of tick-to-tick log returns inside the window.
+        n = self.totals[RETURNS]
+        if n < 2:
+            return None
+        mean = self.totals[RETURN_SUM] / n
+        variance = max(0.0, self.totals[RETURN_SQ_SUM] / n - mean * mean)
+        return math.sqrt(variance * n / (n - 1))
+
+    def price_change(self) -> Optional[float]:
+        return self._change(FIRST_PRICE, LAST_PRICE)
+
+    def volume_change(self) -> Optional[float]:
+        return self._change(FIRST_VOLUME, LAST_VOLUME)
+
+    def coverage(self) -> float:
+        # Share of the window that has observations, by bucket.
+        return min(1.0, len(self.buckets) * self.bucket_size / self.span)
+
+    def _change(self, first_field: int, last_field: int) -> Optional[float]:
+        first = next((b[first_field] for b in self.buckets if b[first_field] is not None), None)
+        last = next((b[last_field] for b in reversed(self.buckets) if b[last_field] is not None), None)
+        if not first or last is None:
+            return None
+        return (last - first) / first * 100
+
+    def _expire(self, now: float) -> None:
+        while self.buckets and self.buckets[0][START] <= now - self.span:
+            expired = self.buckets.popleft()
+            for field in TOTAL_FIELDS:
+                self.totals[field] -= expired[field]
+
+
+class Series:
+    def __init__(self, windows: Optional[Dict[str, List[list]]] = None, last_price: Optional[float] = None,
+                 source_updated_at: Optional[float] = None):
+        windows = windows or {}
+        self.windows = {
+            name: RollingWindow(span, bucket_size, windows.get(name))
+            for name, (span, bucket_size) in WINDOWS.items()
+        }
+        self.last_price = last_price
+        self.source_updated_at = source_updated_at
+
+    def add(self, timestamp: float, price: Optional[float], volume: Optional[float]) -> None:
+        log_return = None
+        if price and self.last_price:
+            log_return = math.log(price / self.last_price)
+        for window in self.windows.values():
+            window.add(timestamp, price, volume, log_return)
+        if price:
+            self.last_price = price
+
+    def __getitem__(self, name: str) -> RollingWindow:
+        return self.windows[name]
+
+
+class MetricsEngine:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or settings.get('METRICS.SNAPSHOT_PATH', '.metrics_snapshot.json')
+        self.snapshot_interval = settings.get('METRICS.SNAPSHOT_INTERVAL', 300)
+        self.series: Dict[str, Series] = {}
+
+        self._saved_at = time.time()
+        self._lock = threading.Lock()
+        self._load()
+
+    def observe(self, key: str, timestamp: float, price: Optional[float] = None,
+                volume: Optional[float] = None, source_updated_at: Optional[float] = None) -> Series:
+        # With a source timestamp, a value is recorded once, at the time the
+        # source produced it; polling the same value again adds nothing.
+        with self._lock:
+            series = self.series.get(key)
+            if series is None:
+                series = self.series[key] = Series()
+            if source_updated_at is not None:
+                if series.source_updated_at is not None and source_updated_at <= series.source_updated_at:
+                    return series
+                series.source_updated_at = source_updated_at
+                timestamp = source_updated_at
+            series.add(timestamp, price, volume)
+            return series
+
+    def save_if_due(self) -> None:
+        if time.time() - self._saved_at >= self.snapshot_interval:
+            self.save()
+
+    def save(self) -> None:
+        with self._lock:
+            snapshot = {
+                key: {
+                    'last_price': series.last_price,
+                    'source_updated_at': series.source_updated_at,
+                    'windows': {name: list(window.buckets) for name, window in series.windows.items()},
+                }
+                for key, series in self.series.items()
+            }
+            self._saved_at = time.time()
+
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not save metrics snapshot: {e}")
+
+    def _load(self) -> None:
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            return
+        for key, state in snapshot.items():
+            self.series[key] = Series(state.get('windows'), state.get('last_price'), state.get('source_updated_at'))
+
+
+def to_timestamp(value) -> Optional[float]:
+    # CoinGecko timestamps are ISO 8601, e.g. 2024-01-01T00:00:00.000Z.
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace('Z', '+00:00')).timestamp()
+    except ValueError:
+        return None
+
+
+def to_float(value) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+_metrics_engine: Optional[MetricsEngine] = None
+_metrics_engine_lock = threading.Lock()
+
+
+def get_metrics_engine() -> MetricsEngine:
+    global _metrics_engine
+    with _metrics_engine_lock:
+        if _metrics_engine is None:
+            _metrics_engine = MetricsEngine()
+        return _metrics_engine
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from configs.config import settings
+
+
+PLAN_CALLS_PER_MINUTE = {
+    'demo': 30,
+    'basic': 250,
+    'analyst': 500,
+    'lite': 500,
+    'pro': 1000,
+}
+
+
+class ApiRateLimiter:
+    def __init__(self, calls_per_minute: float, burst: int = 1):
+        self.calls_per_minute = calls_per_minute
+        self.interval = 60.0 / calls_per_minute
+        self.burst = max(1, burst)
+        self.calls = 0
+        self.throttle_count = 0
+
+        # Scheduling is plain arithmetic on a monotonic clock behind a thread
+        # lock, so the same limiter serves blocking callers and coroutines
+        # running on any event loop.
+        self._next_slot = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            time.sleep(self._reserve())
+            if not self._is_blocked():
+                return
+
+    async def acquire_async(self) -> None:
+        while True:
+            await asyncio.sleep(self._reserve())
+            if not self._is_blocked():
+                return
+
+    def on_throttle(self, retry_after: float) -> None:
+        with self._lock:
+            self.throttle_count += 1
+            self._blocked_until = max(self._blocked_until, time.monotonic() + retry_after)
+            # Calls resume one interval apart once the server allows them
+            # again, instead of spending the whole burst at once.
+            self._next_slot = max(self._next_slot, self._blocked_until + self._tolerance())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'calls_per_minute': self.calls_per_minute,
+                'calls': self.calls,
+                'throttled': self.throttle_count,
+            }
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next_slot - self._tolerance(), self._blocked_until)
+            self._next_slot = max(self._next_slot, start) + self.interval
+            self.calls += 1
+            return start - now
+
+    def _is_blocked(self) -> bool:
+        with self._lock:
+            return time.monotonic() < self._blocked_until
+
+    def _tolerance(self) -> float:
+        return (self.burst - 1) * self.interval
+
+
+def retry_after_seconds(value: Optional[str], default: float) -> float:
+    # Retry-After is either a number of seconds or an HTTP date.
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def plan_calls_per_minute(plan: str) -> float:
+    calls_per_minute = settings.get('Coingecko.CALLS_PER_MINUTE')
+    if calls_per_minute:
+        return float(calls_per_minute)
+    return float(PLAN_CALLS_PER_MINUTE.get(plan.lower(), PLAN_CALLS_PER_MINUTE['demo']))
+
+
+_api_limiters: dict[str, ApiRateLimiter] = {}
+_api_limiters_lock = threading.Lock()
+
+
+def get_api_limiter(api_key: str, plan: str) -> ApiRateLimiter:
+    # CoinGecko enforces its quota per key, so every job in the process that
+    # uses the same key shares one limiter.
+    with _api_limiters_lock:
+        limiter = _api_limiters.get(api_key)
+        if limiter is None:
+            limiter = ApiRateLimiter(
+                calls_per_minute=plan_calls_per_minute(plan),
+                burst=settings.get('Coingecko.RATE_BURST', 5)
+            )
+            _api_limiters[api_key] = limiter
+        return limiter
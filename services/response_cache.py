@@ -0,0 +1,108 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+from configs.config import settings
+
+
+class CachedResponse:
+    def __init__(self, data: Any, etag: Optional[str], stored_at: float):
+        self.data = data
+        self.etag = etag
+        self.stored_at = stored_at
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < ttl
+
+
+class ResponseCache:
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None):
+        self.path = path or settings.get('HTTP_CACHE.PATH', '.coingecko_cache.sqlite')
+        self.max_bytes = max_bytes or settings.get('HTTP_CACHE.MAX_MB', 200) * 1024 * 1024
+        self._counters = {'hits': 0, 'revalidated': 0, 'misses': 0}
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, endpoint TEXT, body TEXT, etag TEXT, "
+            "size INTEGER, stored_at REAL, accessed_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+
+    @staticmethod
+    def key(endpoint: str, params: Optional[Dict] = None) -> str:
+        return f"{endpoint}?{urlencode(sorted((params or {}).items()))}"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT body, etag, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        return CachedResponse(json.loads(row[0]), row[1], row[2])
+
+    def put(self, key: str, endpoint: str, data: Any, etag: Optional[str] = None) -> None:
+        body = json.dumps(data)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, body, etag, size, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, endpoint, body, etag, len(body), now, now)
+            )
+            self._evict()
+
+    def touch(self, key: str) -> None:
+        # A 304 proves the stored body is still current, so it starts a new
+        # TTL period without being rewritten.
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE key = ?", (now, now, key)
+            )
+
+    def record(self, outcome: str) -> None:
+        with self._lock:
+            self._counters[outcome] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+            return {'entries': entries, 'bytes': size, **self._counters}
+
+    def _evict(self) -> None:
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        # Drop least recently used entries down to 90% of the budget so a
+        # full cache does not evict on every insert.
+        target = self.max_bytes * 0.9
+        stale_keys = []
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if total <= target:
+                break
+            stale_keys.append((key,))
+            total -= size
+        self._db.executemany("DELETE FROM responses WHERE key = ?", stale_keys)
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    global _response_cache
+    if not settings.get('HTTP_CACHE.ENABLED', True):
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache()
+        return _response_cache
@@ -0,0 +1,65 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Iterable, List, Optional
+
+
+class WorkerPool:
+    def __init__(self, concurrency: int, item_timeout: Optional[float] = None):
+        self.concurrency = max(1, concurrency)
+        self.item_timeout = item_timeout
+
+        self._wakeups: List[tuple] = []
+        self._lock = threading.Lock()
+
+    def set_concurrency(self, concurrency: int) -> None:
+        # Safe to call from any thread while a run is in progress; the new
+        # limit applies as soon as the dispatcher wakes up.
+        with self._lock:
+            self.concurrency = max(1, concurrency)
+            wakeups = list(self._wakeups)
+        for loop, event in wakeups:
+            loop.call_soon_threadsafe(event.set)
+
+    async def run(self, items: Iterable, handler: Callable[[Any], Awaitable],
+                  on_progress: Optional[Callable[[int, int], None]] = None) -> List:
+        # Keeps up to `concurrency` handlers running and starts the next item
+        # as soon as any of them finishes. Results come back in input order;
+        # failures and timeouts are returned as exceptions, as with
+        # asyncio.gather(..., return_exceptions=True).
+        items = list(items)
+        results: List = [None] * len(items)
+        in_flight = 0
+        done = 0
+        wakeup = asyncio.Event()
+        entry = (asyncio.get_running_loop(), wakeup)
+        with self._lock:
+            self._wakeups.append(entry)
+
+        async def work(index: int, item):
+            nonlocal in_flight, done
+            try:
+                results[index] = await asyncio.wait_for(handler(item), self.item_timeout)
+            except Exception as e:
+                results[index] = e
+            finally:
+                in_flight -= 1
+                done += 1
+                if on_progress:
+                    on_progress(done, len(items))
+                wakeup.set()
+
+        tasks = []
+        try:
+            for index, item in enumerate(items):
+                while in_flight >= self.concurrency:
+                    wakeup.clear()
+                    await wakeup.wait()
+                in_flight += 1
+                tasks.append(asyncio.create_task(work(index, item)))
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            with self._lock:
+                self._wakeups.remove(entry)
+        return results
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+from services.backfill_checkpoints import DAY, BackfillCheckpoints, backfill_windows
+
+
+class TestBackfillWindows(unittest.TestCase):
+    def test_windows_cover_exactly_the_requested_days(self):
+        now = 1_700_000_000
+        windows = backfill_windows(now, days=365, window_days=90)
+
+        self.assertEqual(windows[0][0], now - 365 * DAY)
+        self.assertGreater(windows[-1][1], now)
+        self.assertLessEqual(windows[-1][0], now)
+        for (_, end), (start, _) in zip(windows, windows[1:]):
+            self.assertEqual(end, start)
+        for start, end in windows[1:]:
+            self.assertEqual(end - start, 90 * DAY)
+        for _, end in windows:
+            self.assertEqual(end % (90 * DAY), 0)
+
+    def test_window_ends_are_stable_between_runs(self):
+        now = 1_700_000_000
+        first = backfill_windows(now, days=365, window_days=90)
+        later = backfill_windows(now + 3 * DAY, days=365, window_days=90)
+
+        self.assertTrue({end for _, end in first[1:]}.issubset({end for _, end in later}))
+
+    def test_horizon_on_the_grid_gives_a_full_first_window(self):
+        now = 10 * 90 * DAY + DAY
+        windows = backfill_windows(now, days=90 * 5 + 1, window_days=90)
+
+        self.assertEqual(windows[0], (5 * 90 * DAY, 6 * 90 * DAY))
+
+
+class TestBackfillCheckpoints(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'checkpoints.json')
+
+    def test_finished_windows_survive_a_restart(self):
+        checkpoints = BackfillCheckpoints(self.path)
+        checkpoints.mark_done('bitcoin', 90 * DAY)
+        checkpoints.mark_done('bitcoin', 180 * DAY)
+
+        resumed = BackfillCheckpoints(self.path)
+
+        self.assertTrue(resumed.is_done('bitcoin', 90 * DAY))
+        self.assertTrue(resumed.is_done('bitcoin', 180 * DAY))
+        self.assertFalse(resumed.is_done('bitcoin', 270 * DAY))
+        self.assertFalse(resumed.is_done('ethereum', 90 * DAY))
+
+    def test_missing_or_corrupt_file_starts_empty(self):
+        self.assertFalse(BackfillCheckpoints(self.path).is_done('bitcoin', 0))
+
+        with open(self.path, 'w') as f:
+            f.write('{not json')
+        self.assertFalse(BackfillCheckpoints(self.path).is_done('bitcoin', 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+from unittest import mock
+
+from aws.repositories.key_cache import KeyCache
+
+
+class TestKeyCache(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('aws.repositories.key_cache.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = KeyCache(ttl_seconds=60, max_size=3)
+
+    def test_entries_expire_after_ttl(self):
+        self.cache.put('btc', {'id': '1'})
+
+        self.now += 59
+        self.assertEqual(self.cache.get('btc'), {'id': '1'})
+
+        self.now += 2
+        self.assertIsNone(self.cache.get('btc'))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_least_recently_used_entry_is_dropped(self):
+        for key in ('a', 'b', 'c'):
+            self.cache.put(key, {'id': key})
+        self.cache.get('a')
+
+        self.cache.put('d', {'id': 'd'})
+
+        self.assertIsNone(self.cache.get('b'))
+        self.assertEqual([self.cache.get(key)['id'] for key in ('a', 'c', 'd')], ['a', 'c', 'd'])
+
+    def test_pop_expired_returns_and_removes_stale_items(self):
+        self.cache.put('old', {'id': 'old'})
+        self.now += 30
+        self.cache.put('new', {'id': 'new'})
+        self.now += 31
+
+        self.assertEqual(self.cache.pop_expired(), [{'id': 'old'}])
+        self.assertEqual(len(self.cache), 1)
+
+    def test_fill_marks_cache_warm_and_full_invalidate_resets_it(self):
+        self.cache.fill([('a', {'id': 'a'}), ('b', {'id': 'b'})])
+        self.assertTrue(self.cache.warmed)
+
+        self.cache.invalidate('a')
+        self.assertIsNone(self.cache.get('a'))
+        self.assertTrue(self.cache.warmed)
+
+        self.cache.invalidate()
+        self.assertEqual(len(self.cache), 0)
+        self.assertFalse(self.cache.warmed)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import random
+import unittest
+from typing import Optional
+
+from models.token_stats import TokenStats
+from services.market_transform import transform_markets
+
+
+# Per-coin reference of the derived TokenStats fields, as they were computed
+# before the vectorized transform.
+def reference_liquidity_score(market_cap, volume) -> Optional[str]:
+    if market_cap and volume and market_cap > 0:
+        return str(round((volume / market_cap) * 100, 4))
+    return None
+
+
+def reference_tvl(market_cap, volume) -> Optional[str]:
+    if not market_cap or not volume:
+        return None
+    velocity = volume / market_cap if market_cap > 0 else 0
+    tvl_factor = max(0.1, min(2.0, 1 / (1 + velocity * 10)))
+    return str(round(market_cap * tvl_factor * 0.3, 2))
+
+
+def reference_record(coin: dict) -> Optional[dict]:
+    symbol = (coin.get('symbol') or '').upper()
+    if not symbol or not coin.get('id') or not isinstance(coin.get('name', ''), str):
+        return None
+
+    def safe_str(value):
+        return str(value) if value is not None else None
+
+    return {
+        'symbol': symbol,
+        'coingecko_id': coin['id'],
+        'coin_name': coin.get('name', ''),
+        'price': safe_str(coin.get('current_price')),
+        'market_cap': safe_str(coin.get('market_cap')),
+        'trading_volume_24h': safe_str(coin.get('total_volume')),
+        'token_max_supply': safe_str(coin.get('max_supply')),
+        'token_total_supply': safe_str(coin.get('total_supply')),
+        'transactions_count_30d': safe_str(coin.get('market_cap_rank')),
+        'volume_24h_change_24h': safe_str(coin.get('price_change_percentage_24h')),
+        'ath': safe_str(coin.get('ath')),
+        'atl': safe_str(coin.get('atl')),
+        'liquidity_score': reference_liquidity_score(coin.get('market_cap'), coin.get('total_volume')),
+        'tvl': reference_tvl(coin.get('market_cap'), coin.get('total_volume')),
+        'source_updated_at': coin.get('last_updated'),
+    }
+
+
+def market_coin(rng: random.Random, i: int) -> dict:
+    def amount(scale: float):
+        return rng.choice([None, 0, rng.randint(1, 10 ** 6), rng.uniform(0, scale)])
+
+    coin = {
+        'id': rng.choice([f'coin-{i}'] * 8 + [None, '']),
+        'symbol': rng.choice([f'c{i}'] * 8 + [None, '']),
+        'name': rng.choice([f'Coin {i}'] * 8 + [None, '']),
+        'current_price': amount(1e5),
+        'market_cap': amount(1e12),
+        'total_volume': amount(1e11),
+        'max_supply': amount(1e10),
+        'total_supply': amount(1e10),
+        'market_cap_rank': rng.choice([None, i + 1]),
+        'price_change_percentage_24h': rng.choice([None, rng.uniform(-50, 50)]),
+        'ath': amount(1e5),
+        'atl': amount(1.0),
+        'last_updated': '2026-01-01T00:00:00.000Z',
+    }
+    if i % 11 == 0:
+        del coin['name']
+    return coin
+
+
+class TestTransformMarkets(unittest.TestCase):
+    ROUNDED_FIELDS = {'liquidity_score': 4, 'tvl': 2}
+
+    def test_matches_per_coin_reference(self):
+        rng = random.Random(7)
+        coins = [market_coin(rng, i) for i in range(2000)]
+
+        expected = [record for record in map(reference_record, coins) if record]
+        records = transform_markets(coins)
+
+        self.assertEqual([r['coingecko_id'] for r in records], [r['coingecko_id'] for r in expected])
+        for record, reference in zip(records, expected):
+            for field, value in reference.items():
+                digits = self.ROUNDED_FIELDS.get(field)
+                if digits is None or value is None or record[field] is None:
+                    self.assertEqual(record[field], value, field)
+                else:
+                    # NumPy rounds through a scaled multiply, so a tie may
+                    # land on the other side of the last digit.
+                    self.assertAlmostEqual(float(record[field]), float(value), delta=10 ** -digits, msg=field)
+
+    def test_metric_fields_are_left_for_the_metrics_engine(self):
+        record = transform_markets([{'id': 'a', 'symbol': 'a', 'name': 'A', 'market_cap': 10.0, 'total_volume': 1.0}])[0]
+
+        self.assertIsNone(record['volume_1m_change_1m'])
+        self.assertIsNone(record['vwap_24h'])
+        self.assertIsNone(record['volatility_24h'])
+
+    def test_records_match_the_model(self):
+        coins = [market_coin(random.Random(3), i) for i in range(50)]
+
+        for record in transform_markets(coins):
+            self.assertEqual(set(record), set(TokenStats.model_fields))
+            self.assertEqual(TokenStats(**record).model_dump(), record)
+
+    def test_empty_response(self):
+        self.assertEqual(transform_markets([]), [])
+        self.assertEqual(transform_markets([{'id': None, 'symbol': 'x'}]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
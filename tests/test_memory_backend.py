@@ -0,0 +1,291 @@
+import os
+import unittest
+from unittest import mock
+from uuid import uuid4
+
+from botocore.exceptions import ClientError
+
+from aws.repositories.exchange_repository import ExchangeRepository
+from aws.repositories.generic_repository import UNCHANGED, WRITTEN
+from aws.repositories.token_stats_history_repository import TokenStatsHistoryRepository
+from aws.repositories.token_repository import TokensRepository
+from aws.repositories.token_stats_repository import TokenStatsRepository
+from configs.config import settings
+from models.exchanges import Exchange
+from models.tokens import Token
+
+
+_memory_backend = mock.patch.dict(os.environ, {'DYNACONF_STORAGE__BACKEND': 'memory'})
+
+
+def setUpModule():
+    _memory_backend.start()
+    settings.reload()
+
+
+def tearDownModule():
+    _memory_backend.stop()
+    settings.reload()
+
+
+def token_stats_item(symbol: str, price: str, updated_at: str) -> dict:
+    return {
+        'id': str(uuid4()),
+        'symbol': symbol,
+        'coin_name': symbol.lower(),
+        'coingecko_id': symbol.lower(),
+        'price': price,
+        'source_updated_at': updated_at,
+        'created_at': '2026-01-01 00:00:00',
+        'updated_at': '2026-01-01 00:00:00',
+    }
+
+
+class TestUpsertItems(unittest.TestCase):
+    def setUp(self):
+        self.repo = TokenStatsRepository()
+        self.symbol = f"T{uuid4().hex[:8].upper()}"
+
+    def test_new_item_is_written(self):
+        outcomes = self.repo.upsert_items([token_stats_item(self.symbol, '1.0', '2026-01-01T00:00:00Z')])
+
+        self.assertEqual(outcomes, [WRITTEN])
+        self.assertEqual(self.repo.get_by_symbol(self.symbol)['price'], '1.0')
+
+    def test_same_content_is_unchanged(self):
+        self.repo.upsert_items([token_stats_item(self.symbol, '1.0', '2026-01-01T00:00:00Z')])
+        outcomes = self.repo.upsert_items([token_stats_item(self.symbol, '1.0', '2026-01-01T00:00:00Z')])
+
+        self.assertEqual(outcomes, [UNCHANGED])
+
+    def test_newer_content_is_written(self):
+        self.repo.upsert_items([token_stats_item(self.symbol, '1.0', '2026-01-01T00:00:00Z')])
+        outcomes = self.repo.upsert_items([token_stats_item(self.symbol, '2.0', '2026-01-01T00:01:00Z')])
+
+        self.assertEqual(outcomes, [WRITTEN])
+        stored = self.repo.get_by_symbol(self.symbol)
+        self.assertEqual(stored['price'], '2.0')
+        self.assertEqual(len(self.repo.query_by_index('symbol', self.symbol)), 1)
+
+    def test_older_content_does_not_overwrite(self):
+        self.repo.upsert_items([token_stats_item(self.symbol, '2.0', '2026-01-01T00:01:00Z')])
+        outcomes = self.repo.upsert_items([token_stats_item(self.symbol, '1.0', '2026-01-01T00:00:00Z')])
+
+        self.assertEqual(outcomes, [UNCHANGED])
+        self.assertEqual(self.repo.get_by_symbol(self.symbol)['price'], '2.0')
+
+    def test_empty_index_keys_are_not_written(self):
+        item = token_stats_item(self.symbol, '1.0', '2026-01-01T00:00:00Z')
+        item['coingecko_id'] = ''
+
+        self.assertEqual(self.repo.upsert_items([item]), [WRITTEN])
+        self.assertNotIn('coingecko_id', self.repo.get_by_id(item['id']))
+
+
+    def test_coins_sharing_a_symbol_keep_separate_rows(self):
+        first = token_stats_item(self.symbol, '1.0', '2026-01-01T00:00:00Z')
+        second = {**token_stats_item(self.symbol, '2.0', '2026-01-01T00:00:00Z'), 'coingecko_id': f"other-{self.symbol}"}
+
+        self.assertEqual(self.repo.upsert_items([first, second]), [WRITTEN, WRITTEN])
+        stored = self.repo.query_by_index('symbol', self.symbol)
+        self.assertEqual(sorted(item['price'] for item in stored), ['1.0', '2.0'])
+
+    def test_duplicate_keys_in_a_batch_write_the_last_item_once(self):
+        first = token_stats_item(self.symbol, '1.0', '2026-01-01T00:00:00Z')
+        second = token_stats_item(self.symbol, '2.0', '2026-01-01T00:01:00Z')
+
+        self.assertEqual(self.repo.upsert_items([first, second]), [UNCHANGED, WRITTEN])
+        stored = self.repo.query_by_index('symbol', self.symbol)
+        self.assertEqual([item['price'] for item in stored], ['2.0'])
+
+
+class TestQueryByIndex(unittest.TestCase):
+    def setUp(self):
+        self.repo = TokenStatsRepository()
+        self.symbol = f"Q{uuid4().hex[:8].upper()}"
+        self.repo.upsert_items([token_stats_item(self.symbol, '1.0', '2026-01-01T00:00:00Z')])
+
+    def index_error(self, message: str) -> ClientError:
+        return ClientError({'Error': {'Code': 'ValidationException', 'Message': message}}, 'Query')
+
+    def test_missing_index_falls_back_to_scan(self):
+        items = self.repo.query_by_index('coin_name', self.symbol.lower())
+
+        self.assertEqual([item['symbol'] for item in items], [self.symbol])
+
+    def test_backfilling_index_falls_back_to_scan(self):
+        error = self.index_error('Cannot read from backfilling global secondary index: symbol-index')
+        with mock.patch.object(self.repo, 'iter_query', side_effect=error):
+            items = self.repo.query_by_index('symbol', self.symbol)
+
+        self.assertEqual([item['symbol'] for item in items], [self.symbol])
+
+    def test_missing_table_is_raised(self):
+        error = ClientError({'Error': {'Code': 'ResourceNotFoundException',
+                                       'Message': 'Requested resource not found'}}, 'Query')
+        with mock.patch.object(self.repo, 'iter_query', side_effect=error):
+            with self.assertRaises(ClientError):
+                self.repo.query_by_index('symbol', self.symbol)
+
+    def test_other_validation_errors_are_raised(self):
+        error = self.index_error('Invalid KeyConditionExpression: Attribute name is a reserved keyword')
+        with mock.patch.object(self.repo, 'iter_query', side_effect=error):
+            with self.assertRaises(ClientError):
+                self.repo.query_by_index('symbol', self.symbol)
+
+
+class TestTokenStatsHistory(unittest.TestCase):
+    def setUp(self):
+        self.repo = TokenStatsHistoryRepository()
+        self.coingecko_id = f"coin-{uuid4().hex[:8]}"
+
+    def point(self, timestamp: int, price: str = '1.0') -> dict:
+        return {'coingecko_id': self.coingecko_id, 'timestamp': timestamp, 'symbol': 'C', 'price': price}
+
+    def test_batch_put_keeps_last_version_of_duplicate_keys(self):
+        outcomes = self.repo.batch_put([self.point(100, '1.0'), self.point(200), self.point(100, '3.0')])
+
+        self.assertEqual(outcomes, [WRITTEN, WRITTEN, WRITTEN])
+        stored = self.repo.range(self.coingecko_id, 0, 1000)
+        self.assertEqual([(item['timestamp'], item['price']) for item in stored], [(100, '3.0'), (200, '1.0')])
+
+    def test_range_is_inclusive_and_ascending(self):
+        self.repo.append_records([self.point(timestamp) for timestamp in range(1000, 1100, 10)])
+
+        stored = self.repo.range(self.coingecko_id, 1020, 1050)
+
+        self.assertEqual([item['timestamp'] for item in stored], [1020, 1030, 1040, 1050])
+
+    def test_latest_returns_newest_first(self):
+        self.repo.append_records([self.point(timestamp) for timestamp in range(1000, 1100, 10)])
+
+        latest = self.repo.latest(self.coingecko_id, 3)
+
+        self.assertEqual([item['timestamp'] for item in latest], [1090, 1080, 1070])
+
+    def test_append_sets_expiry_from_retention(self):
+        self.repo.append_records([self.point(1000)], retention_seconds=60)
+
+        self.assertEqual(self.repo.latest(self.coingecko_id)[0]['expires_at'], 1060)
+
+
+class TestTokenMatching(unittest.TestCase):
+    def setUp(self):
+        self.repo = TokensRepository()
+        self.symbol = f"SYM{uuid4().hex[:8]}"
+
+    def test_other_coin_with_same_symbol_is_not_matched(self):
+        self.repo.create(Token(coingecko_id=f"first-{self.symbol}", symbol=self.symbol).model_dump())
+
+        self.assertIsNone(self.repo.find_matching(Token(coingecko_id=f"second-{self.symbol}", symbol=self.symbol)))
+
+    def test_legacy_row_without_coingecko_id_is_matched_by_symbol(self):
+        legacy = Token(symbol=self.symbol).model_dump()
+        self.repo.create(legacy)
+
+        match = self.repo.find_matching(Token(coingecko_id=f"coin-{self.symbol}", symbol=self.symbol))
+
+        self.assertEqual(match['id'], legacy['id'])
+
+    def test_coingecko_id_match_wins(self):
+        self.repo.create(Token(symbol=self.symbol).model_dump())
+        stored = Token(coingecko_id=f"coin-{self.symbol}", symbol=self.symbol).model_dump()
+        self.repo.create(stored)
+
+        match = self.repo.find_matching(Token(coingecko_id=f"coin-{self.symbol}", symbol=self.symbol))
+
+        self.assertEqual(match['id'], stored['id'])
+
+
+class TestGetMany(unittest.TestCase):
+    def setUp(self):
+        self.repo = TokensRepository()
+        self.tokens = [Token(coingecko_id=f"coin-{uuid4().hex[:8]}", symbol='GM').model_dump() for _ in range(250)]
+        for token in self.tokens:
+            self.repo.create(token)
+        self.ids = [token['id'] for token in self.tokens]
+
+    def test_items_across_chunks_are_returned_by_id(self):
+        for concurrent in (False, True):
+            items = self.repo.get_many(self.ids, concurrent=concurrent)
+
+            self.assertEqual(set(items), set(self.ids))
+            self.assertEqual(items[self.ids[200]]['coingecko_id'], self.tokens[200]['coingecko_id'])
+
+    def test_missing_and_repeated_ids_are_tolerated(self):
+        items = self.repo.get_many([self.ids[0], str(uuid4()), self.ids[0]])
+
+        self.assertEqual(list(items), [self.ids[0]])
+
+    def test_projection_always_includes_id(self):
+        items = self.repo.get_many(self.ids[:3], projection=['symbol'])
+
+        self.assertEqual({tuple(sorted(item)) for item in items.values()}, {('id', 'symbol')})
+
+
+class TestParallelScan(unittest.TestCase):
+    def setUp(self):
+        self.repo = TokensRepository()
+        self.symbol = f"PS{uuid4().hex[:8].upper()}"
+        self.ids = set()
+        for _ in range(120):
+            token = Token(coingecko_id=f"coin-{uuid4().hex[:8]}", symbol=self.symbol).model_dump()
+            self.repo.create(token)
+            self.ids.add(token['id'])
+
+    def scanned_ids(self, **kwargs) -> list:
+        return [item['id'] for item in self.repo.parallel_scan(**kwargs) if item.get('symbol') == self.symbol]
+
+    def test_every_item_is_returned_once(self):
+        scanned = self.scanned_ids(segments=4, page_size=7)
+
+        self.assertEqual(len(scanned), len(self.ids))
+        self.assertEqual(set(scanned), self.ids)
+
+    def test_projection_limits_attributes(self):
+        items = [item for item in self.repo.parallel_scan(segments=3, projection=['id', 'symbol'])
+                 if item.get('symbol') == self.symbol]
+
+        self.assertEqual({tuple(sorted(item)) for item in items}, {('id', 'symbol')})
+
+    def test_stopping_early_releases_the_segments(self):
+        # close() joins the segment threads, so this hangs if they keep
+        # waiting on a full page queue.
+        scan = self.repo.parallel_scan(segments=4, page_size=1)
+        next(scan)
+        scan.close()
+
+    def test_segment_errors_are_raised(self):
+        error = ClientError({'Error': {'Code': 'InternalServerError', 'Message': 'boom'}}, 'Scan')
+        with mock.patch.object(self.repo.client, 'scan', side_effect=error):
+            with self.assertRaises(ClientError):
+                list(self.repo.parallel_scan(segments=2))
+
+
+class TestExchangeLookup(unittest.TestCase):
+    def setUp(self):
+        self.repo = ExchangeRepository()
+        self.names = [f"Exchange {uuid4().hex[:8]}" for _ in range(3)]
+        for name in self.names:
+            self.repo.create_if_not_exists(Exchange(name=name))
+
+    def test_known_names_are_fetched_in_one_batch(self):
+        with mock.patch.object(self.repo, 'get_by_id') as get_by_id:
+            found = self.repo.find_many_by_name([*self.names, 'Unknown exchange'])
+
+        get_by_id.assert_not_called()
+        self.assertEqual(set(found), set(self.names))
+
+    def test_upsert_uses_prefetched_rows(self):
+        known = self.repo.find_many_by_name(self.names)
+
+        with mock.patch.object(self.repo, 'get_by_id') as get_by_id:
+            item, outcome = self.repo.upsert_details(Exchange(name=self.names[0], website='https://example.com'), known)
+
+        get_by_id.assert_not_called()
+        self.assertEqual(outcome, WRITTEN)
+        self.assertEqual(item['id'], known[self.names[0]]['id'])
+
+
+if __name__ == '__main__':
+    unittest.main()
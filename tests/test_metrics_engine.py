@@ -0,0 +1,104 @@
+import os
+import tempfile
+import unittest
+
+from services.metrics_engine import COUNT, VOLUME_SUM, MetricsEngine, RollingWindow, to_timestamp
+
+
+HOUR = 3600
+
+
+class TestRollingWindow(unittest.TestCase):
+    def setUp(self):
+        self.window = RollingWindow(span=3 * HOUR, bucket_size=HOUR)
+        self.start = 1_700_000_000 - 1_700_000_000 % HOUR
+
+    def add(self, hours: float, price: float = 1.0, volume: float | None = 10.0):
+        self.window.add(self.start + hours * HOUR, price, volume, None)
+
+    def test_observations_in_one_bucket_are_merged(self):
+        self.add(0)
+        self.add(0.5, volume=20.0)
+
+        self.assertEqual(len(self.window.buckets), 1)
+        self.assertEqual(self.window.mean_volume(), 15.0)
+
+    def test_buckets_older_than_span_expire(self):
+        for hour, volume in enumerate([10.0, 20.0, 30.0, 40.0]):
+            self.add(hour, volume=volume)
+
+        self.assertEqual([bucket[VOLUME_SUM] for bucket in self.window.buckets], [20.0, 30.0, 40.0])
+        self.assertEqual(self.window.mean_volume(), 30.0)
+
+    def test_totals_follow_expiry(self):
+        for hour in range(10):
+            self.add(hour, volume=float(hour))
+
+        self.assertEqual(self.window.totals[COUNT], sum(bucket[COUNT] for bucket in self.window.buckets))
+        self.assertEqual(self.window.totals[VOLUME_SUM], sum(bucket[VOLUME_SUM] for bucket in self.window.buckets))
+
+    def test_gap_longer_than_span_empties_window(self):
+        self.add(0, volume=100.0)
+        self.add(10, volume=1.0)
+
+        self.assertEqual(len(self.window.buckets), 1)
+        self.assertEqual(self.window.mean_volume(), 1.0)
+
+    def test_coverage_grows_with_buckets(self):
+        self.add(0)
+        self.assertAlmostEqual(self.window.coverage(), 1 / 3)
+
+        self.add(1)
+        self.add(2)
+        self.add(3)
+        self.assertEqual(self.window.coverage(), 1.0)
+
+    def test_price_change_spans_the_window(self):
+        self.add(0, price=100.0)
+        self.add(1, price=110.0)
+        self.add(2, price=120.0)
+
+        self.assertAlmostEqual(self.window.price_change(), 20.0)
+
+    def test_missing_volume_does_not_dilute_mean(self):
+        self.add(0, volume=10.0)
+        self.add(0.2, volume=None)
+        self.add(0.4, volume=30.0)
+
+        self.assertEqual(self.window.totals[COUNT], 3)
+        self.assertEqual(self.window.mean_volume(), 20.0)
+
+    def test_buckets_from_old_snapshot_layout_are_dropped(self):
+        window = RollingWindow(span=3 * HOUR, bucket_size=HOUR, buckets=[[self.start] + [0] * 11])
+
+        self.assertEqual(len(window.buckets), 0)
+
+
+class TestMetricsEngine(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.engine = MetricsEngine(os.path.join(directory.name, 'metrics.json'))
+
+    def test_unchanged_source_time_is_observed_once(self):
+        for tick in range(3):
+            series = self.engine.observe('token:bitcoin', 1_700_000_000 + tick * 60, price=1.0, volume=10.0,
+                                         source_updated_at=1_700_000_000)
+
+        self.assertEqual(series['24h'].totals[COUNT], 1)
+
+    def test_advancing_source_time_is_observed_at_source_time(self):
+        self.engine.observe('token:bitcoin', 1_700_000_900, volume=10.0, source_updated_at=1_700_000_000)
+        series = self.engine.observe('token:bitcoin', 1_700_000_960, volume=20.0, source_updated_at=1_700_000_060)
+
+        self.assertEqual(series['24h'].totals[COUNT], 2)
+        self.assertEqual(series.source_updated_at, 1_700_000_060)
+
+    def test_to_timestamp_parses_coingecko_format(self):
+        self.assertEqual(to_timestamp('2023-11-14T22:13:20.000Z'), 1_700_000_000)
+        self.assertIsNone(to_timestamp(None))
+        self.assertIsNone(to_timestamp('not a date'))
+
+
+if __name__ == '__main__':
+    unittest.main()
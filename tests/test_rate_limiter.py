@@ -0,0 +1,83 @@
+import unittest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest import mock
+
+from services.rate_limiter import ApiRateLimiter, plan_calls_per_minute, retry_after_seconds
+
+
+class TestApiRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        self.sleeps = []
+        for target, side_effect in (('monotonic', lambda: self.now), ('sleep', self.sleep)):
+            patcher = mock.patch(f'services.rate_limiter.time.{target}', side_effect=side_effect)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+    def call_times(self, limiter: ApiRateLimiter, count: int) -> list:
+        times = []
+        for _ in range(count):
+            limiter.acquire()
+            times.append(self.now - 1000.0)
+        return times
+
+    def test_calls_are_spaced_by_the_interval(self):
+        limiter = ApiRateLimiter(calls_per_minute=60)
+
+        self.assertEqual(self.call_times(limiter, 3), [0.0, 1.0, 2.0])
+        self.assertEqual(limiter.stats()['calls'], 3)
+
+    def test_burst_allows_calls_back_to_back(self):
+        limiter = ApiRateLimiter(calls_per_minute=60, burst=3)
+
+        self.assertEqual(self.call_times(limiter, 5), [0.0, 0.0, 0.0, 1.0, 2.0])
+
+    def test_idle_time_does_not_bank_more_than_the_burst(self):
+        limiter = ApiRateLimiter(calls_per_minute=60, burst=2)
+        self.now += 100
+
+        self.assertEqual(self.call_times(limiter, 4), [100.0, 100.0, 101.0, 102.0])
+
+    def test_throttle_blocks_until_retry_after(self):
+        limiter = ApiRateLimiter(calls_per_minute=60, burst=3)
+        limiter.on_throttle(10)
+
+        self.assertEqual(self.call_times(limiter, 3), [10.0, 11.0, 12.0])
+        self.assertEqual(limiter.stats()['throttled'], 1)
+
+
+class TestRetryAfter(unittest.TestCase):
+    def test_seconds(self):
+        self.assertEqual(retry_after_seconds('12', 60), 12.0)
+        self.assertEqual(retry_after_seconds('-3', 60), 0.0)
+
+    def test_http_date(self):
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+
+        self.assertAlmostEqual(retry_after_seconds(format_datetime(retry_at, usegmt=True), 60), 30, delta=2)
+
+    def test_missing_or_invalid_uses_default(self):
+        self.assertEqual(retry_after_seconds(None, 60), 60)
+        self.assertEqual(retry_after_seconds('soon', 60), 60)
+
+
+class TestPlanCallsPerMinute(unittest.TestCase):
+    def test_known_and_unknown_plans(self):
+        with mock.patch('services.rate_limiter.settings') as settings:
+            settings.get.return_value = None
+            self.assertEqual(plan_calls_per_minute('Pro'), 1000)
+            self.assertEqual(plan_calls_per_minute('unknown'), 30)
+
+    def test_configured_rate_wins(self):
+        with mock.patch('services.rate_limiter.settings') as settings:
+            settings.get.return_value = 120
+            self.assertEqual(plan_calls_per_minute('demo'), 120)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from services.response_cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.cache = ResponseCache(os.path.join(directory.name, 'cache.sqlite'), max_bytes=1000)
+
+    def test_key_ignores_param_order(self):
+        self.assertEqual(
+            ResponseCache.key('coins/bitcoin', {'b': 2, 'a': 1}),
+            ResponseCache.key('coins/bitcoin', {'a': 1, 'b': 2})
+        )
+
+    def test_stored_response_round_trips(self):
+        self.cache.put('coins/bitcoin?', 'coins/bitcoin', {'id': 'bitcoin'}, etag='"v1"')
+
+        cached = self.cache.get('coins/bitcoin?')
+
+        self.assertEqual(cached.data, {'id': 'bitcoin'})
+        self.assertEqual(cached.etag, '"v1"')
+        self.assertTrue(cached.is_fresh(60))
+        self.assertIsNone(self.cache.get('coins/ethereum?'))
+
+    def test_touch_starts_a_new_ttl_period(self):
+        with mock.patch('services.response_cache.time.time', return_value=1000.0):
+            self.cache.put('coins/bitcoin?', 'coins/bitcoin', {'id': 'bitcoin'})
+        with mock.patch('services.response_cache.time.time', return_value=2000.0):
+            self.assertFalse(self.cache.get('coins/bitcoin?').is_fresh(60))
+            self.cache.touch('coins/bitcoin?')
+            self.assertTrue(self.cache.get('coins/bitcoin?').is_fresh(60))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        body = 'x' * 250
+        with mock.patch('services.response_cache.time.time', side_effect=range(1000, 2000)):
+            self.cache.put('a', 'a', body)
+            self.cache.put('b', 'b', body)
+            self.cache.get('a')
+            self.cache.put('c', 'c', body)
+            self.cache.put('d', 'd', body)
+
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertLessEqual(self.cache.stats()['bytes'], 1000)
+
+    def test_stats_count_entries_and_outcomes(self):
+        self.cache.put('a', 'a', [1, 2, 3])
+        self.cache.record('hits')
+        self.cache.record('misses')
+        self.cache.record('misses')
+
+        stats = self.cache.stats()
+
+        self.assertEqual(stats['entries'], 1)
+        self.assertEqual(stats['bytes'], len('[1, 2, 3]'))
+        self.assertEqual((stats['hits'], stats['revalidated'], stats['misses']), (1, 0, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
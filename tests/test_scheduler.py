@@ -0,0 +1,93 @@
+import threading
+import time
+import unittest
+from unittest import mock
+
+from scheduler.scheduler import TaskScheduler
+
+
+HOUR = 3600
+
+
+class TestTaskScheduler(unittest.TestCase):
+    def setUp(self):
+        self.logs = []
+        self.scheduler = TaskScheduler(self.logs)
+        self.scheduler.initial_load_done = True
+        self.runs = {'tokens': 0, 'exchanges': 0, 'details': 0}
+        self.release_details = threading.Event()
+        self.addCleanup(self.release_details.set)
+        self.addCleanup(self.scheduler.stop)
+
+        for task_type in self.runs:
+            patcher = mock.patch.object(self.scheduler, f"_run_{task_type}_task",
+                                        side_effect=lambda task_type=task_type: self.run_task(task_type))
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def run_task(self, task_type: str):
+        self.runs[task_type] += 1
+        if task_type == 'details':
+            self.release_details.wait(5)
+
+    def start(self, tokens: float = 0.02, exchanges: float = 0.05, details: float = 0.01):
+        self.scheduler.start(tokens, exchanges / HOUR, details / HOUR)
+
+    def test_long_job_does_not_block_other_lanes(self):
+        self.start()
+        time.sleep(0.3)
+
+        self.assertEqual(self.runs['details'], 1)
+        self.assertGreaterEqual(self.runs['tokens'], 5)
+        self.assertGreaterEqual(self.runs['exchanges'], 2)
+
+    def test_stop_right_after_start_ends_the_loop_thread(self):
+        self.start(tokens=60, exchanges=60, details=60)
+        thread = self.scheduler.thread
+
+        self.scheduler.stop()
+
+        thread.join(2)
+        self.assertFalse(thread.is_alive())
+        self.assertIsNone(self.scheduler.loop)
+
+    def test_no_runs_after_stop(self):
+        self.start(details=60)
+        time.sleep(0.1)
+        self.scheduler.stop()
+        self.scheduler.thread.join(2)
+        runs = dict(self.runs)
+
+        time.sleep(0.1)
+
+        self.assertEqual(self.runs, runs)
+
+    def test_stop_during_initial_load_keeps_loop_from_starting(self):
+        self.scheduler.initial_load_done = False
+        with mock.patch.object(self.scheduler, '_run_initial_load', side_effect=self.scheduler.stop):
+            self.start()
+
+        self.assertIsNone(self.scheduler.loop)
+        self.assertIsNone(self.scheduler.thread)
+
+    def test_second_start_reuses_the_running_loop(self):
+        self.start(tokens=60, exchanges=60, details=60)
+        loop = self.scheduler.loop
+
+        self.start(tokens=60, exchanges=60, details=60)
+
+        self.assertIs(self.scheduler.loop, loop)
+
+    def test_restart_after_stop(self):
+        self.start(tokens=60, exchanges=60, details=60)
+        self.scheduler.stop()
+        self.scheduler.thread.join(2)
+
+        self.start()
+        time.sleep(0.1)
+
+        self.assertGreaterEqual(self.runs['tokens'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+from unittest import mock
+
+from aws import throttling
+from aws.throttling import LIVE_BUDGET, AdaptiveRateLimiter, get_write_limiter
+
+
+class TestAdaptiveRateLimiter(unittest.TestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch('aws.throttling.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.limiter = AdaptiveRateLimiter(rate=10.0, max_rate=20.0)
+
+    def test_increase_follows_time_not_call_count(self):
+        for _ in range(100):
+            self.limiter.on_success()
+        self.assertEqual(self.limiter.rate, 10.0)
+
+        self.now += 2.0
+        self.limiter.on_success()
+        self.now += 1.0
+        self.limiter.on_success()
+
+        self.assertEqual(self.limiter.rate, 12.0)
+
+    def test_idle_gap_counts_as_one_second(self):
+        self.now += 600.0
+        self.limiter.on_success()
+
+        self.assertEqual(self.limiter.rate, 11.0)
+
+    def test_increase_stops_at_max_rate(self):
+        for _ in range(50):
+            self.now += 1.0
+            self.limiter.on_success()
+
+        self.assertEqual(self.limiter.rate, 20.0)
+
+    def test_throttle_halves_the_rate_and_reaches_yielding_limiters(self):
+        background = AdaptiveRateLimiter(rate=8.0)
+        self.limiter.yielding.append(background)
+
+        self.limiter.on_throttle()
+
+        self.assertEqual(self.limiter.rate, 5.0)
+        self.assertEqual(background.rate, 4.0)
+        self.assertEqual(self.limiter.throttle_count, 1)
+
+    def test_rate_never_drops_below_min_rate(self):
+        for _ in range(20):
+            self.limiter.on_throttle()
+
+        self.assertEqual(self.limiter.rate, self.limiter.min_rate)
+
+
+class TestGetWriteLimiter(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.dict(throttling._write_limiters, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_provisioned_capacity_caps_the_rate(self):
+        limiter = get_write_limiter('Provisioned', write_capacity=25)
+
+        self.assertEqual(limiter.rate, 25)
+        self.assertEqual(limiter.max_rate, 25)
+
+    def test_on_demand_table_uses_configured_max_rate(self):
+        limiter = get_write_limiter('OnDemand', write_capacity=0)
+
+        self.assertEqual(limiter.max_rate, throttling.settings.get('DYNAMO.MAX_WRITE_RATE', 1000))
+
+    def test_budget_gets_a_share_and_yields_to_live(self):
+        live = get_write_limiter('Shared', write_capacity=40)
+        background = get_write_limiter('Shared', write_capacity=40, budget='backfill', share=0.25)
+
+        self.assertIs(get_write_limiter('Shared', write_capacity=40, budget=LIVE_BUDGET), live)
+        self.assertEqual(background.rate, 10)
+        self.assertEqual(background.max_rate, 10)
+        self.assertIn(background, live.yielding)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import asyncio
+import unittest
+
+from services.worker_pool import WorkerPool
+
+
+class TestWorkerPool(unittest.IsolatedAsyncioTestCase):
+    async def test_results_keep_input_order(self):
+        async def handler(delay):
+            await asyncio.sleep(delay)
+            return delay
+
+        results = await WorkerPool(concurrency=3).run([0.03, 0.01, 0.02], handler)
+
+        self.assertEqual(results, [0.03, 0.01, 0.02])
+
+    async def test_concurrency_is_never_exceeded(self):
+        running = 0
+        peak = 0
+
+        async def handler(item):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+
+        await WorkerPool(concurrency=2).run(range(10), handler)
+
+        self.assertEqual(peak, 2)
+
+    async def test_next_item_starts_when_any_slot_frees(self):
+        finished = []
+        finished_before_start = {}
+
+        async def handler(item):
+            finished_before_start[item] = list(finished)
+            await asyncio.sleep(0.2 if item == 'slow' else 0.01)
+            finished.append(item)
+
+        await WorkerPool(concurrency=2).run(['slow', 'a', 'b', 'c'], handler)
+
+        self.assertNotIn('slow', finished_before_start['c'])
+        self.assertEqual(finished[-1], 'slow')
+
+    async def test_failures_and_timeouts_are_returned(self):
+        async def handler(item):
+            if item == 'fail':
+                raise ValueError(item)
+            if item == 'slow':
+                await asyncio.sleep(1)
+            return item
+
+        results = await WorkerPool(concurrency=3, item_timeout=0.05).run(['ok', 'fail', 'slow'], handler)
+
+        self.assertEqual(results[0], 'ok')
+        self.assertIsInstance(results[1], ValueError)
+        self.assertIsInstance(results[2], asyncio.TimeoutError)
+
+    async def test_progress_is_reported_per_item(self):
+        progress = []
+
+        async def handler(item):
+            return item
+
+        await WorkerPool(concurrency=2).run(range(3), handler, on_progress=lambda done, total: progress.append((done, total)))
+
+        self.assertEqual(progress, [(1, 3), (2, 3), (3, 3)])
+
+    async def test_raising_concurrency_mid_run_takes_effect(self):
+        pool = WorkerPool(concurrency=1)
+        running = 0
+        peak = 0
+
+        async def handler(item):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            if item == 0:
+                pool.set_concurrency(3)
+            await asyncio.sleep(0.02)
+            running -= 1
+
+        await pool.run(range(6), handler)
+
+        self.assertEqual(peak, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -94,7 +94,7 @@ def run_manual_task(task_func, task_name, logs_list):
 def render_manual_tasks():
     st.subheader("🎯 Ручное выполнение задач")
     
-    col1, col2, col3, col4 = st.columns(4)
+    col1, col2, col3, col4, col5 = st.columns(5)
 
     with col1:
         if st.button("📊 TokenStats", disabled=st.session_state.task_running):
@@ -132,6 +132,15 @@ def render_manual_tasks():
                 st.session_state.logs
             )
 
+    with col5:
+        if st.button("🕰️ История токенов", disabled=st.session_state.task_running):
+            from scheduler.tasks import manual_task_history_backfill
+            run_manual_task(
+                manual_task_history_backfill, 
+                "Загрузка истории токенов", 
+                st.session_state.logs
+            )
+
     if st.session_state.task_running:
         st.info("⏳ Выполняется ручная задача...")
 